@@ -0,0 +1,205 @@
+import asyncio
+import json
+import time
+from collections import deque
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import (
+    ADMISSION_ADMIN_PREFIXES,
+    ADMISSION_BACKOFF,
+    ADMISSION_CLASSES,
+    ADMISSION_EXEMPT_PREFIXES,
+    ADMISSION_FILE_PREFIXES,
+    ADMISSION_INITIAL_LIMITS,
+    ADMISSION_LOW_PRIORITY_SHARE,
+    ADMISSION_MAX_LIMIT,
+    ADMISSION_MIN_LIMIT,
+    ADMISSION_NORMAL_PRIORITY_SHARE,
+    ADMISSION_PRIORITY_ROLES,
+    ADMISSION_QUEUE_TIMEOUT,
+    ADMISSION_TARGET_LATENCY,
+)
+from app.metrics import Counter, Gauge, register
+from app.security import identify
+
+LOW = "low"
+NORMAL = "normal"
+HIGH = "high"
+
+_SHARES = {LOW: ADMISSION_LOW_PRIORITY_SHARE, NORMAL: ADMISSION_NORMAL_PRIORITY_SHARE, HIGH: 1.0}
+
+# Upstream statuses that mean "overloaded", as opposed to a bad request
+_OVERLOAD_STATUSES = {502, 503, 504}
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class AdaptiveLimit:
+    """
+    AIMD concurrency limit for one route class.
+
+    Every request that gets its response headers within the target latency
+    raises the limit by 1/limit (about +1 per limit's worth of requests);
+    a slow or overloaded response cuts it by ADMISSION_BACKOFF, at most once
+    per target interval so one burst of slow calls counts as one signal.
+    """
+
+    def __init__(self, name: str, initial: int, target: float):
+        self.name = name
+        self.limit = float(initial)
+        self.target = target
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    def _capacity(self, priority: str) -> int:
+        return max(1, int(self.limit * _SHARES[priority]))
+
+    async def acquire(self, priority: str) -> bool:
+        if self.in_flight < self._capacity(priority):
+            self.in_flight += 1
+            return True
+        if priority != HIGH:
+            return False
+        # Wait for release() to hand over a slot; in_flight stays unchanged
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, ADMISSION_QUEUE_TIMEOUT)
+            return True
+        except asyncio.TimeoutError:
+            # A slot handed over just as the wait timed out is still ours
+            return waiter.done() and not waiter.cancelled()
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self, latency: float, overloaded: bool) -> None:
+        now = time.monotonic()
+        if overloaded or latency > self.target:
+            if now - self._last_decrease >= self.target:
+                self._last_decrease = now
+                self.limit = max(ADMISSION_MIN_LIMIT, self.limit * ADMISSION_BACKOFF)
+        else:
+            self.limit = min(ADMISSION_MAX_LIMIT, self.limit + 1 / self.limit)
+
+        if self.in_flight <= self.limit:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self.in_flight -= 1
+
+
+_limits = {
+    name: AdaptiveLimit(name, ADMISSION_INITIAL_LIMITS[name], ADMISSION_TARGET_LATENCY[name])
+    for name in ADMISSION_CLASSES
+}
+
+SHED = register(Counter(
+    "gateway_admission_rejected_total", "Requests shed by admission control", ("class", "priority"),
+))
+register(Gauge(
+    "gateway_admission_limit", "Current adaptive concurrency limit per route class", ("class",),
+    lambda: [((name,), round(limit.limit, 2)) for name, limit in _limits.items()],
+))
+register(Gauge(
+    "gateway_admission_in_flight", "Admitted requests in flight per route class", ("class",),
+    lambda: [((name,), limit.in_flight) for name, limit in _limits.items()],
+))
+
+
+# The /batch envelope does no upstream work itself; each of its sub-requests
+# re-enters the app and is admitted (and shed) in its own route class
+BATCH_PATH = "/batch"
+
+
+def route_class(method: str, path: str) -> str | None:
+    if path.startswith(ADMISSION_EXEMPT_PREFIXES) or path.rstrip("/") == BATCH_PATH:
+        return None
+    if path.startswith(ADMISSION_FILE_PREFIXES):
+        return "files"
+    if path.startswith(ADMISSION_ADMIN_PREFIXES):
+        return "admin"
+    return "reads" if method in READ_METHODS else "writes"
+
+
+def priority(method: str, current: dict | None) -> str:
+    if current is None:
+        return LOW
+    if method not in READ_METHODS and ADMISSION_PRIORITY_ROLES.intersection(current["roles"]):
+        return HIGH
+    return NORMAL
+
+
+class AdmissionMiddleware:
+    """
+    Sheds load before it reaches the upstreams: a request is admitted only
+    while its route class has spare concurrency for its priority, otherwise
+    it is rejected at once with 503 and Retry-After.
+
+    The caller is identified from the JWT (through the shared token cache)
+    and seeded into request state, so get_current_user does not decode the
+    token again. A /batch call is not admitted as a whole: every sub-request
+    takes its own slot, so a batch of N costs N admissions and is shed
+    sub-request by sub-request under load.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        name = route_class(method, scope["path"])
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        current = scope.get("state", {}).get("current_user") or identify(scope)
+        level = priority(method, current)
+        limit = _limits[name]
+        if not await limit.acquire(level):
+            SHED.inc(name, level)
+            await _reject(send)
+            return
+
+        state = scope.setdefault("state", {})
+        if current is not None:
+            state.update(current_user=current, user_id=current["user_id"], roles=current["roles"])
+
+        started = time.monotonic()
+        latency = None
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal latency, status_code
+            if message["type"] == "http.response.start":
+                latency = time.monotonic() - started
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if latency is None:
+                latency = time.monotonic() - started
+            limit.release(latency, status_code in _OVERLOAD_STATUSES)
+
+
+async def _reject(send: Send) -> None:
+    body = json.dumps({"detail": "Gateway overloaded"}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", b"1"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import random
+
+import httpx
+
+from app.circuit import get_breaker
+from app.clients import get_client
+from app.config import (
+    SERVICE_URLS,
+    SERVICE_REPLICAS,
+    LB_STRATEGY,
+    LB_STRATEGIES,
+    UPSTREAM_NAMES,
+    HEALTH_CHECK_PATH,
+    HEALTH_CHECK_INTERVAL,
+    HEALTH_CHECK_TIMEOUT,
+    HEALTH_CHECK_FALL,
+    HEALTH_CHECK_RISE,
+)
+from app.metrics import Gauge, register
+
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.url = url
+        self.healthy = True
+        self.outstanding = 0
+        self._failures = 0
+        self._successes = 0
+
+    def acquire(self) -> None:
+        self.outstanding += 1
+
+    def release(self) -> None:
+        self.outstanding -= 1
+
+    def report_health(self, ok: bool) -> None:
+        if ok:
+            self._failures = 0
+            self._successes += 1
+            if not self.healthy and self._successes >= HEALTH_CHECK_RISE:
+                self.healthy = True
+                logger.info("Upstream replica %s is healthy again", self.url)
+        else:
+            self._successes = 0
+            self._failures += 1
+            if self.healthy and self._failures >= HEALTH_CHECK_FALL:
+                self.healthy = False
+                logger.warning("Draining unhealthy upstream replica %s", self.url)
+
+
+class UpstreamPool:
+    """Replicas of one service plus the strategy used to pick between them."""
+
+    def __init__(self, name: str, urls: list[str], strategy: str):
+        self.name = name
+        self.replicas = [Replica(url) for url in urls]
+        self.strategy = strategy
+        self._next = 0
+
+    def choose(self, exclude: Replica | None = None) -> Replica | None:
+        """
+        Pick a replica whose circuit accepts calls, preferring healthy ones.
+        If health checks have drained every replica we still try them all
+        rather than reject traffic outright. exclude is avoided when any
+        other replica is available (used for hedged attempts).
+        """
+        available = [r for r in self.replicas if get_breaker(r.url).available()]
+        candidates = [r for r in available if r.healthy] or available
+        if exclude is not None and len(candidates) > 1:
+            candidates = [r for r in candidates if r is not exclude] or candidates
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+        if self.strategy == "round_robin":
+            self._next += 1
+            return candidates[self._next % len(candidates)]
+        if self.strategy == "least_outstanding":
+            return min(candidates, key=lambda r: r.outstanding)
+        first, second = random.sample(candidates, 2)
+        return first if first.outstanding <= second.outstanding else second
+
+    def retry_after(self) -> int:
+        return min(get_breaker(r.url).retry_after() for r in self.replicas)
+
+
+# Keyed by the logical service URL that routers pass to proxy_request
+_pools: dict[str, UpstreamPool] = {
+    SERVICE_URLS[name]: UpstreamPool(name, urls, LB_STRATEGIES[name])
+    for name, urls in SERVICE_REPLICAS.items()
+}
+
+
+def get_pool(service_url: str) -> UpstreamPool:
+    pool = _pools.get(service_url)
+    if pool is None:
+        name = UPSTREAM_NAMES.get(service_url, service_url)
+        pool = _pools[service_url] = UpstreamPool(name, [service_url], LB_STRATEGY)
+    return pool
+
+
+async def _probe(replica: Replica) -> None:
+    try:
+        resp = await get_client(replica.url).get(
+            replica.url + HEALTH_CHECK_PATH, timeout=HEALTH_CHECK_TIMEOUT
+        )
+        replica.report_health(resp.status_code < 500)
+    except httpx.HTTPError:
+        replica.report_health(False)
+
+
+async def run_health_checks() -> None:
+    """Probe every replica forever; started as a task from the app lifespan."""
+    while True:
+        await asyncio.gather(*(_probe(r) for pool in _pools.values() for r in pool.replicas))
+        await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+
+
+register(Gauge(
+    "gateway_upstream_replica_healthy", "1 if the replica passes health checks", ("upstream", "replica"),
+    lambda: [((pool.name, r.url), int(r.healthy)) for pool in _pools.values() for r in pool.replicas],
+))
+register(Gauge(
+    "gateway_upstream_replica_outstanding", "Requests in flight per replica", ("upstream", "replica"),
+    lambda: [((pool.name, r.url), r.outstanding) for pool in _pools.values() for r in pool.replicas],
+))
@@ -0,0 +1,219 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+from fastapi import Request, Response
+
+from app.config import (
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_MAX_ENTRY_BYTES,
+)
+from app.metrics import Gauge, register
+from app.proxy import proxy_request
+from app.security import get_current_user
+from app.singleflight import SingleFlight
+
+# Browsers may keep the body but must revalidate with If-None-Match each time
+DEFAULT_CACHE_CONTROL = "private, no-cache"
+
+
+class CachedResponse:
+    def __init__(self, path: str, status_code: int, headers: dict, body: bytes, expires_at: float):
+        self.path = path
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.expires_at = expires_at
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+class ResponseCache:
+    """LRU of upstream GET responses bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, CachedResponse] = OrderedDict()
+
+    def get(self, key: tuple) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self._remove(key)
+        self.misses += 1
+        return None
+
+    def put(self, key: tuple, entry: CachedResponse) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self.size_bytes += len(entry.body)
+        while self._entries and (
+            len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, prefix: str = "") -> int:
+        """Drop every entry whose path starts with prefix; returns the count."""
+        keys = [key for key, entry in self._entries.items() if entry.path.startswith(prefix)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key)
+        self.size_bytes -= len(entry.body)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES)
+
+# Cache misses for the same key share one upstream request, so a burst of
+# identical GETs (e.g. right after a volume is published) hits the upstream once
+inflight = SingleFlight()
+
+register(Gauge(
+    "gateway_response_cache", "Response cache size and lookups", ("kind",),
+    lambda: [((kind,), value) for kind, value in response_cache.stats().items()],
+))
+register(Gauge(
+    "gateway_coalesced_requests", "Single-flight calls and requests that shared them", ("kind",),
+    lambda: [((kind,), value) for kind, value in inflight.stats().items()],
+))
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so ignore any W/ prefix
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+async def _scope_key(request: Request, scope: str) -> str:
+    if scope == "public":
+        return ""
+    current = await get_current_user(request)
+    if scope == "user":
+        return f"user:{current['user_id']}"
+    return "roles:" + ",".join(sorted(current.get("roles") or []))
+
+
+def _encoding_key(request: Request) -> str:
+    # Accept-Encoding is forwarded upstream and the body is cached as raw
+    # upstream bytes, so callers that accept different codings must not share
+    # an entry (a gzip body would otherwise reach a client without gzip)
+    codings = request.headers.get("accept-encoding", "").lower().replace(" ", "")
+    return ",".join(sorted(filter(None, codings.split(","))))
+
+
+def _own_response(response: Response) -> Response:
+    """A fresh copy of response, so single-flight waiters never share one object."""
+    copy = Response(content=response.body, status_code=response.status_code)
+    copy.raw_headers = list(response.raw_headers)
+    return copy
+
+
+def _vary(entry: CachedResponse) -> str:
+    # Entries are keyed by Accept-Encoding, so say so to any cache in between
+    fields = [field.strip() for field in entry.headers.get("vary", "").split(",") if field.strip()]
+    if "accept-encoding" not in (field.lower() for field in fields):
+        fields.append("Accept-Encoding")
+    return ", ".join(fields)
+
+
+def _respond(request: Request, entry: CachedResponse, cache_status: str) -> Response:
+    # Lower-case names, so they replace the cached upstream headers rather
+    # than being sent next to them; the 304 carries the same validators,
+    # Cache-Control and Vary as the 200
+    headers = {
+        "etag": entry.etag,
+        "cache-control": entry.headers.get("cache-control", DEFAULT_CACHE_CONTROL),
+        "vary": _vary(entry),
+        "x-cache": cache_status,
+    }
+    if _etag_matches(request.headers.get("If-None-Match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=entry.body,
+        status_code=entry.status_code,
+        headers={**entry.headers, **headers},
+    )
+
+
+async def cached_proxy_request(
+    service_url: str,
+    request: Request,
+    ttl: float,
+    scope: str = "roles",
+    invalidates: tuple[str, ...] = (),
+) -> Response:
+    """
+    proxy_request with an opt-in response cache for GETs.
+
+    Entries are keyed by path, query, Accept-Encoding and the caller's
+    scope: "roles" shares entries between users with the same role set,
+    "user" keeps them per user and "public" shares them with everyone. Concurrent misses for the same
+    key are coalesced into a single upstream request. Non-GET requests are
+    proxied unchanged and, when they succeed, purge the path prefixes in
+    invalidates.
+    """
+    if request.method != "GET":
+        response = await proxy_request(service_url, request)
+        if response.status_code < 400:
+            for prefix in invalidates:
+                response_cache.invalidate(prefix)
+        return response
+
+    # Resolving the scope also authenticates the caller before a cached
+    # body can be served
+    key = (
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+        await _scope_key(request, scope),
+        _encoding_key(request),
+    )
+    entry = response_cache.get(key)
+    if entry is not None:
+        return _respond(request, entry, "HIT")
+
+    # Every waiter gets the same result, so each builds its own Response from it
+    result = await inflight.do(key, lambda: _fetch(service_url, request, ttl, key))
+    if isinstance(result, CachedResponse):
+        return _respond(request, result, "MISS")
+    return _own_response(result)
+
+
+async def _fetch(service_url: str, request: Request, ttl: float, key: tuple) -> CachedResponse | Response:
+    """Fetch and cache one response; non-cacheable responses are returned as is."""
+    response = await proxy_request(service_url, request, stream=False)
+    if response.status_code != 200 or len(response.body) > RESPONSE_CACHE_MAX_ENTRY_BYTES:
+        return response
+
+    headers = {
+        name: value
+        for name, value in response.headers.items()
+        if name not in ("content-length", "etag", "set-cookie")
+    }
+    entry = CachedResponse(
+        request.url.path, response.status_code, headers, response.body, time.time() + ttl
+    )
+    if "no-store" not in headers.get("cache-control", ""):
+        response_cache.put(key, entry)
+    return entry
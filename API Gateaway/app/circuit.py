@@ -0,0 +1,161 @@
+import asyncio
+import math
+import time
+from collections import deque
+
+from app.config import (
+    CIRCUIT_WINDOW_SECONDS,
+    CIRCUIT_MIN_CALLS,
+    CIRCUIT_ERROR_RATE,
+    CIRCUIT_SLOW_CALL_SECONDS,
+    CIRCUIT_SLOW_CALL_RATE,
+    CIRCUIT_OPEN_SECONDS,
+    CIRCUIT_HALF_OPEN_CALLS,
+    BULKHEAD_MAX_CONCURRENT,
+    BULKHEAD_WAIT_SECONDS,
+    BULKHEAD_LIMITS,
+    UPSTREAM_NAMES,
+)
+from app.metrics import Gauge, register
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Closed -> open when the error or slow-call rate over a sliding window
+    crosses its threshold; open -> half-open after CIRCUIT_OPEN_SECONDS;
+    half-open lets a few probe calls through and closes once they all
+    succeed, or reopens on the first failure.
+    """
+
+    def __init__(self):
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._calls: deque[tuple[float, bool, bool]] = deque()
+        self._failures = 0
+        self._slow = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def available(self) -> bool:
+        """Whether allow_request() would currently let a call through."""
+        if self.state == OPEN:
+            return time.monotonic() - self.opened_at >= CIRCUIT_OPEN_SECONDS
+        if self.state == HALF_OPEN:
+            return self._probes_in_flight < CIRCUIT_HALF_OPEN_CALLS
+        return True
+
+    def allow_request(self) -> bool:
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < CIRCUIT_OPEN_SECONDS:
+                return False
+            self.state = HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        if self.state == HALF_OPEN:
+            if self._probes_in_flight >= CIRCUIT_HALF_OPEN_CALLS:
+                return False
+            self._probes_in_flight += 1
+        return True
+
+    def retry_after(self) -> int:
+        remaining = CIRCUIT_OPEN_SECONDS - (time.monotonic() - self.opened_at)
+        return max(1, math.ceil(remaining))
+
+    def record(self, ok: bool | None, latency: float) -> None:
+        """Record the outcome of an allowed call; ok=None means it was abandoned."""
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if ok is False:
+                self._open()
+            elif ok:
+                self._probe_successes += 1
+                if self._probe_successes >= CIRCUIT_HALF_OPEN_CALLS:
+                    self._close()
+            return
+        if ok is None or self.state != CLOSED:
+            return
+
+        now = time.monotonic()
+        failed = not ok
+        slow = latency >= CIRCUIT_SLOW_CALL_SECONDS
+        self._calls.append((now, failed, slow))
+        self._failures += failed
+        self._slow += slow
+        while self._calls and self._calls[0][0] < now - CIRCUIT_WINDOW_SECONDS:
+            _, old_failed, old_slow = self._calls.popleft()
+            self._failures -= old_failed
+            self._slow -= old_slow
+
+        total = len(self._calls)
+        if total >= CIRCUIT_MIN_CALLS and (
+            self._failures / total >= CIRCUIT_ERROR_RATE
+            or self._slow / total >= CIRCUIT_SLOW_CALL_RATE
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self._calls.clear()
+        self._failures = 0
+        self._slow = 0
+
+
+class Bulkhead:
+    """Caps concurrent requests to one upstream so it cannot starve the others."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def acquire(self) -> bool:
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), BULKHEAD_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_bulkheads: dict[str, Bulkhead] = {}
+
+
+def get_breaker(service_url: str) -> CircuitBreaker:
+    breaker = _breakers.get(service_url)
+    if breaker is None:
+        breaker = _breakers[service_url] = CircuitBreaker()
+    return breaker
+
+
+def get_bulkhead(service_url: str) -> Bulkhead:
+    bulkhead = _bulkheads.get(service_url)
+    if bulkhead is None:
+        limit = BULKHEAD_LIMITS.get(service_url, BULKHEAD_MAX_CONCURRENT)
+        bulkhead = _bulkheads[service_url] = Bulkhead(limit)
+    return bulkhead
+
+
+register(Gauge(
+    "gateway_circuit_open", "1 if the replica's circuit is open or half-open", ("upstream", "replica", "state"),
+    lambda: [
+        ((UPSTREAM_NAMES.get(url, url), url, breaker.state), int(breaker.state != CLOSED))
+        for url, breaker in _breakers.items()
+    ],
+))
+register(Gauge(
+    "gateway_bulkhead_in_flight", "Requests in flight per upstream bulkhead", ("upstream",),
+    lambda: [((UPSTREAM_NAMES.get(url, url),), bulkhead.in_flight) for url, bulkhead in _bulkheads.items()],
+))
@@ -0,0 +1,61 @@
+import httpx
+
+from app.config import (
+    SERVICE_REPLICAS,
+    UPSTREAM_CONNECTION_LIMITS,
+    UPSTREAM_MAX_CONNECTIONS,
+    UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+    UPSTREAM_KEEPALIVE_EXPIRY,
+    UPSTREAM_HTTP2,
+    UPSTREAM_CONNECT_TIMEOUT,
+    UPSTREAM_READ_TIMEOUT,
+    UPSTREAM_WRITE_TIMEOUT,
+    UPSTREAM_POOL_TIMEOUT,
+)
+
+# One pooled client per upstream replica base URL. Services that share a URL
+# (e.g. /volumes is served by the articles service) share a pool.
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _build_client(max_connections: int) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(UPSTREAM_MAX_KEEPALIVE_CONNECTIONS, max_connections),
+            keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            connect=UPSTREAM_CONNECT_TIMEOUT,
+            read=UPSTREAM_READ_TIMEOUT,
+            write=UPSTREAM_WRITE_TIMEOUT,
+            pool=UPSTREAM_POOL_TIMEOUT,
+        ),
+        http2=UPSTREAM_HTTP2,
+        follow_redirects=False,
+    )
+
+
+async def open_clients() -> None:
+    """Create the shared upstream clients. Called from the app lifespan."""
+    for name, urls in SERVICE_REPLICAS.items():
+        for url in urls:
+            if url not in _clients:
+                _clients[url] = _build_client(UPSTREAM_CONNECTION_LIMITS[name])
+
+
+async def close_clients() -> None:
+    """Close every pooled client and drop its keep-alive connections."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def get_client(service_url: str) -> httpx.AsyncClient:
+    """Return the pooled client for an upstream, creating it on first use."""
+    client = _clients.get(service_url)
+    if client is None or client.is_closed:
+        client = _build_client(UPSTREAM_MAX_CONNECTIONS)
+        _clients[service_url] = client
+    return client
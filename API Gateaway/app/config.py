@@ -19,5 +19,202 @@ SERVICE_URLS = {
     "files": "http://fileprocessing:7000",
 }
 
+# Each service may run several replicas behind the gateway, e.g.
+# SERVICE_REPLICAS_ARTICLES=http://articles-1:8000,http://articles-2:8000.
+# SERVICE_URLS stays the logical address routers refer to a service by.
+SERVICE_REPLICAS = {
+    name: [u.strip() for u in os.getenv(f"SERVICE_REPLICAS_{name.upper()}", url).split(",") if u.strip()]
+    for name, url in SERVICE_URLS.items()
+}
+
+# Upstream base URL (logical or replica) -> service name, used to label metrics
+UPSTREAM_NAMES = {url: name for name, url in SERVICE_URLS.items()}
+UPSTREAM_NAMES.update({url: name for name, urls in SERVICE_REPLICAS.items() for url in urls})
+
+# Replica selection: "round_robin", "least_outstanding" or "p2c"
+# (power of two choices); LB_STRATEGY_<SERVICE> overrides per service
+LB_STRATEGY = os.getenv("LB_STRATEGY", "p2c")
+LB_STRATEGIES = {
+    name: os.getenv(f"LB_STRATEGY_{name.upper()}", LB_STRATEGY)
+    for name in SERVICE_URLS
+}
+
+# Active health checks against each replica's /health endpoint. A replica
+# is drained after HEALTH_CHECK_FALL consecutive failures and restored after
+# HEALTH_CHECK_RISE consecutive successes.
+HEALTH_CHECK_ENABLED = os.getenv("HEALTH_CHECK_ENABLED", "true").lower() in ("1", "true", "yes")
+HEALTH_CHECK_PATH = os.getenv("HEALTH_CHECK_PATH", "/health")
+HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", "5"))
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+HEALTH_CHECK_FALL = int(os.getenv("HEALTH_CHECK_FALL", "2"))
+HEALTH_CHECK_RISE = int(os.getenv("HEALTH_CHECK_RISE", "2"))
+
 SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
 ALGORITHM = "HS256"
+
+# Upstream connection pooling. One shared httpx client is kept per service
+# (see app/clients.py); these values size its pool and timeouts.
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "100"))
+UPSTREAM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30"))
+# Requires the "http2" extra of httpx and an upstream that speaks HTTP/2
+UPSTREAM_HTTP2 = os.getenv("UPSTREAM_HTTP2", "false").lower() in ("1", "true", "yes")
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "3"))
+UPSTREAM_READ_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", "10"))
+UPSTREAM_WRITE_TIMEOUT = float(os.getenv("UPSTREAM_WRITE_TIMEOUT", "10"))
+UPSTREAM_POOL_TIMEOUT = float(os.getenv("UPSTREAM_POOL_TIMEOUT", "5"))
+
+# Per-service override of the connection cap, e.g. UPSTREAM_MAX_CONNECTIONS_FILES=20
+UPSTREAM_CONNECTION_LIMITS = {
+    name: int(os.getenv(f"UPSTREAM_MAX_CONNECTIONS_{name.upper()}", UPSTREAM_MAX_CONNECTIONS))
+    for name in SERVICE_URLS
+}
+
+# Bodies larger than this (or of unknown length) are streamed through the
+# gateway instead of being buffered in memory
+PROXY_BUFFER_LIMIT = int(os.getenv("PROXY_BUFFER_LIMIT", str(256 * 1024)))
+
+# Verified JWT claims are cached until the token's exp, bounded by size and
+# by a maximum lifetime for tokens without (or with a very distant) exp
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+JWT_CACHE_MAX_TTL = float(os.getenv("JWT_CACHE_MAX_TTL", "900"))
+
+# Aggregated endpoints (e.g. /articles/{id}/reviewers): max concurrent
+# upstream calls per aggregation and per-source time budgets in seconds.
+# Enrichment sources that miss their budget yield partial results.
+AGGREGATOR_CONCURRENCY = int(os.getenv("AGGREGATOR_CONCURRENCY", "8"))
+AGGREGATOR_TIMEOUTS = {
+    "articles": float(os.getenv("AGGREGATOR_TIMEOUT_ARTICLES", "5")),
+    "reviews": float(os.getenv("AGGREGATOR_TIMEOUT_REVIEWS", "5")),
+    "users": float(os.getenv("AGGREGATOR_TIMEOUT_USERS", "2")),
+    "auth": float(os.getenv("AGGREGATOR_TIMEOUT_AUTH", "2")),
+}
+
+# Opt-in response cache for idempotent GETs (see app/cache.py)
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRY_BYTES", str(4 * 1024 * 1024)))
+RESPONSE_CACHE_TTLS = {
+    "keywords": float(os.getenv("RESPONSE_CACHE_TTL_KEYWORDS", "300")),
+    "volumes": float(os.getenv("RESPONSE_CACHE_TTL_VOLUMES", "30")),
+    "reviewers": float(os.getenv("RESPONSE_CACHE_TTL_REVIEWERS", "30")),
+}
+
+# Shared secret for internal service-to-gateway calls (cache invalidation)
+SHARED_SERVICE_SECRET = os.getenv("SHARED_SERVICE_SECRET", "service-shared-secret")
+
+# Per-upstream circuit breaker (see app/circuit.py). The circuit opens when,
+# within the sliding window, enough calls were made and either the error
+# rate or the slow-call rate crosses its threshold.
+CIRCUIT_WINDOW_SECONDS = float(os.getenv("CIRCUIT_WINDOW_SECONDS", "30"))
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "20"))
+CIRCUIT_ERROR_RATE = float(os.getenv("CIRCUIT_ERROR_RATE", "0.5"))
+CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "5"))
+CIRCUIT_SLOW_CALL_RATE = float(os.getenv("CIRCUIT_SLOW_CALL_RATE", "0.8"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "15"))
+CIRCUIT_HALF_OPEN_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_CALLS", "3"))
+
+# Per-upstream bulkhead: max requests in flight to one service, and how long
+# a request may wait for a slot before being rejected with 503
+BULKHEAD_MAX_CONCURRENT = int(os.getenv("BULKHEAD_MAX_CONCURRENT", "50"))
+BULKHEAD_WAIT_SECONDS = float(os.getenv("BULKHEAD_WAIT_SECONDS", "0.1"))
+BULKHEAD_LIMITS = {
+    SERVICE_URLS[name]: int(os.getenv(f"BULKHEAD_MAX_CONCURRENT_{name.upper()}", BULKHEAD_MAX_CONCURRENT))
+    for name in SERVICE_URLS
+}
+
+# POST /batch: max sub-requests per batch, how many run at once, and the
+# largest sub-response body returned inline
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "10"))
+BATCH_MAX_RESPONSE_BYTES = int(os.getenv("BATCH_MAX_RESPONSE_BYTES", str(1024 * 1024)))
+
+# Hedged requests: idempotent GETs to these services (comma-separated names)
+# get a second attempt, preferably on another replica, when the first has
+# not answered within the observed latency percentile. HEDGE_BUDGET caps
+# hedges to that fraction of eligible requests.
+HEDGE_SERVICES = {name.strip() for name in os.getenv("HEDGE_SERVICES", "").split(",") if name.strip()}
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.95"))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.02"))
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", "0.25"))
+HEDGE_SAMPLE_SIZE = int(os.getenv("HEDGE_SAMPLE_SIZE", "500"))
+HEDGE_BUDGET = float(os.getenv("HEDGE_BUDGET", "0.05"))
+
+# Absolute deadline (Unix time, seconds) forwarded to upstreams so they can
+# abandon work the caller no longer waits for. A caller may send its own;
+# otherwise the gateway stamps now + UPSTREAM_TOTAL_BUDGET, and a caller's
+# deadline is capped to the same budget. Upstreams only check it until the
+# response starts, so long downloads are never cut off.
+DEADLINE_HEADER = "X-Request-Deadline"
+UPSTREAM_TOTAL_BUDGET = float(os.getenv("UPSTREAM_TOTAL_BUDGET", str(UPSTREAM_READ_TIMEOUT)))
+
+# Adaptive admission control (see app/admission.py). Each route class has a
+# concurrency limit that grows additively while requests finish under the
+# class's target latency and shrinks multiplicatively when they do not.
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_CLASSES = ("reads", "writes", "files", "admin")
+ADMISSION_INITIAL_LIMITS = {
+    "reads": int(os.getenv("ADMISSION_LIMIT_READS", "200")),
+    "writes": int(os.getenv("ADMISSION_LIMIT_WRITES", "100")),
+    "files": int(os.getenv("ADMISSION_LIMIT_FILES", "20")),
+    "admin": int(os.getenv("ADMISSION_LIMIT_ADMIN", "10")),
+}
+ADMISSION_TARGET_LATENCY = {
+    "reads": float(os.getenv("ADMISSION_TARGET_LATENCY_READS", "0.5")),
+    "writes": float(os.getenv("ADMISSION_TARGET_LATENCY_WRITES", "1.0")),
+    "files": float(os.getenv("ADMISSION_TARGET_LATENCY_FILES", "2.0")),
+    "admin": float(os.getenv("ADMISSION_TARGET_LATENCY_ADMIN", "1.0")),
+}
+ADMISSION_MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", "4"))
+ADMISSION_MAX_LIMIT = int(os.getenv("ADMISSION_MAX_LIMIT", "1000"))
+ADMISSION_BACKOFF = float(os.getenv("ADMISSION_BACKOFF", "0.9"))
+# Path prefixes routed to the files/admin classes, and ones never limited
+ADMISSION_FILE_PREFIXES = tuple(os.getenv("ADMISSION_FILE_PREFIXES", "/files").split(","))
+ADMISSION_ADMIN_PREFIXES = tuple(os.getenv("ADMISSION_ADMIN_PREFIXES", "/cache,/analytics").split(","))
+ADMISSION_EXEMPT_PREFIXES = tuple(os.getenv("ADMISSION_EXEMPT_PREFIXES", "/metrics").split(","))
+# Share of a class's limit each priority may fill: anonymous traffic is shed
+# first, authenticated next; editor/admin writes may use the whole limit and
+# queue briefly for a slot instead of being rejected straight away
+ADMISSION_PRIORITY_ROLES = {"editor", "admin"}
+ADMISSION_LOW_PRIORITY_SHARE = float(os.getenv("ADMISSION_LOW_PRIORITY_SHARE", "0.5"))
+ADMISSION_NORMAL_PRIORITY_SHARE = float(os.getenv("ADMISSION_NORMAL_PRIORITY_SHARE", "0.85"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "0.5"))
+
+# Per-caller token-bucket rate limiting (see app/ratelimit.py). Rules are
+# "METHOD /path-prefix rate burst" separated by ";": rate is tokens per
+# second, burst the bucket size; the first matching rule applies and "*"
+# matches any method. Callers are keyed by user id, or by IP when anonymous.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_RULES = [
+    (method.upper(), prefix, float(rate), float(burst))
+    for method, prefix, rate, burst in (
+        rule.split()
+        for rule in os.getenv(
+            "RATE_LIMIT_RULES",
+            "GET /articles/unassigned 2 10; POST /auth/login 0.2 5; POST /auth/register 0.05 3; * / 20 40",
+        ).split(";")
+        if rule.strip()
+    )
+]
+# "memory" keeps buckets in this process; "redis" shares them between gateway replicas
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "redis://redis:6379/0")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# Take the client IP from X-Forwarded-For (only behind a trusted proxy)
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+
+# Response compression (see app/compression.py): bodies of these content
+# types at least COMPRESSION_MIN_SIZE bytes long are gzip- or brotli-encoded
+# when the client accepts it. Low levels keep CPU per response small.
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "5"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_TYPES = (
+    "application/json",
+    "application/problem+json",
+    "application/xml",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
@@ -0,0 +1,71 @@
+from collections import deque
+
+from app.config import (
+    HEDGE_PERCENTILE,
+    HEDGE_MIN_DELAY,
+    HEDGE_DEFAULT_DELAY,
+    HEDGE_SAMPLE_SIZE,
+    HEDGE_BUDGET,
+)
+
+# Recompute the percentile after this many new samples rather than on every call
+_RECOMPUTE_EVERY = 20
+
+
+class LatencyTracker:
+    """Rolling sample of upstream GET latencies and the derived hedge delay."""
+
+    def __init__(self):
+        self._samples: deque[float] = deque(maxlen=HEDGE_SAMPLE_SIZE)
+        self._since_recompute = 0
+        self._delay = HEDGE_DEFAULT_DELAY
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._since_recompute += 1
+        if self._since_recompute >= _RECOMPUTE_EVERY:
+            self._since_recompute = 0
+            ordered = sorted(self._samples)
+            index = min(len(ordered) - 1, int(HEDGE_PERCENTILE * len(ordered)))
+            self._delay = max(HEDGE_MIN_DELAY, ordered[index])
+
+    @property
+    def delay(self) -> float:
+        return self._delay
+
+
+class HedgeBudget:
+    """Token bucket: each eligible request earns HEDGE_BUDGET tokens, a hedge costs one."""
+
+    def __init__(self, capacity: float = 10.0):
+        self.capacity = capacity
+        self.tokens = capacity
+        self.hedges = 0
+
+    def earn(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + HEDGE_BUDGET)
+
+    def spend(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        self.hedges += 1
+        return True
+
+
+_trackers: dict[str, LatencyTracker] = {}
+_budgets: dict[str, HedgeBudget] = {}
+
+
+def get_tracker(upstream: str) -> LatencyTracker:
+    tracker = _trackers.get(upstream)
+    if tracker is None:
+        tracker = _trackers[upstream] = LatencyTracker()
+    return tracker
+
+
+def get_budget(upstream: str) -> HedgeBudget:
+    budget = _budgets.get(upstream)
+    if budget is None:
+        budget = _budgets[upstream] = HedgeBudget()
+    return budget
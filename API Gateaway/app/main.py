@@ -1,3 +1,6 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import (
@@ -12,17 +15,68 @@ from app.routers import (
     analytics,
     fileprocessing,
     volumes,
+    cache,
+    metrics,
+    batch,
+)
+from app.admission import AdmissionMiddleware
+from app.balancer import run_health_checks
+from app.clients import open_clients, close_clients
+from app.compression import CompressionMiddleware
+from app.config import (
+    ADMISSION_ENABLED,
+    COMPRESSION_ENABLED,
+    HEALTH_CHECK_ENABLED,
+    RATE_LIMIT_ENABLED,
 )
+from app.metrics import MetricsMiddleware
+from app.ratelimit import RateLimitMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pooled upstream clients live for the whole process so keep-alive
+    # connections are reused across proxied requests
+    await open_clients()
+    health_checks = asyncio.create_task(run_health_checks()) if HEALTH_CHECK_ENABLED else None
+    try:
+        yield
+    finally:
+        if health_checks is not None:
+            health_checks.cancel()
+            with suppress(asyncio.CancelledError):
+                await health_checks
+        await close_clients()
+
 
-app = FastAPI(title="API Gateway")
+app = FastAPI(title="API Gateway", lifespan=lifespan)
 
+# Inside CORS, so shed and throttled requests still get CORS headers and are
+# counted in metrics; throttling runs first so abusive callers never hold an
+# admission slot
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "Server-Timing",
+        "Retry-After",
+        "RateLimit-Limit",
+        "RateLimit-Remaining",
+        "RateLimit-Reset",
+        "RateLimit-Policy",
+    ],
 )
+# Outermost, so timings cover everything the gateway does
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -35,3 +89,6 @@ app.include_router(notifications.router)
 app.include_router(analytics.router)
 app.include_router(fileprocessing.router)
 app.include_router(volumes.router)
+app.include_router(cache.router)
+app.include_router(metrics.router)
+app.include_router(batch.router)
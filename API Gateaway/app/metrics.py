@@ -0,0 +1,193 @@
+import time
+from contextlib import contextmanager
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Latency buckets in seconds, shared by every histogram
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series: dict[tuple, list[float]] = {}
+
+    def observe(self, *labels, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in self._series.items():
+            for bound, count in zip(BUCKETS, series):
+                bucket_labels = _format_labels(self.labels + ("le",), labels + (bound,))
+                lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+            inf_labels = _format_labels(self.labels + ("le",), labels + ("+Inf",))
+            lines.append(f"{self.name}_bucket{inf_labels} {series[-2]}")
+            plain = _format_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{plain} {series[-1]}")
+            lines.append(f"{self.name}_count{plain} {series[-2]}")
+        return lines
+
+
+class Gauge:
+    """Gauge whose samples are read from a callback at scrape time."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], collect):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.collect = collect
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, value in self.collect():
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {value}")
+        return lines
+
+
+REGISTRY: list = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def render_metrics() -> str:
+    lines: list[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+REQUESTS = register(Counter(
+    "gateway_requests_total", "Requests handled by the gateway", ("route", "method", "status_class"),
+))
+REQUEST_DURATION = register(Histogram(
+    "gateway_request_duration_seconds", "Total time spent in the gateway per request", ("route",),
+))
+PHASE_DURATION = register(Histogram(
+    "gateway_phase_duration_seconds",
+    "Time per request phase: jwt verification, upstream wait, response transfer",
+    ("route", "phase"),
+))
+UPSTREAM_REQUESTS = register(Counter(
+    "gateway_upstream_requests_total", "Proxied upstream requests", ("upstream", "status_class"),
+))
+UPSTREAM_DURATION = register(Histogram(
+    "gateway_upstream_duration_seconds",
+    "Time from sending the upstream request to receiving its response headers",
+    ("upstream",),
+))
+HEDGES = register(Counter(
+    "gateway_hedged_requests_total", "Second attempts sent for slow idempotent upstream calls", ("upstream",),
+))
+
+
+def status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+class RequestTimings:
+    """Per-request phase durations, stored on request.state.timings."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        entries = [f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in self.phases.items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+@contextmanager
+def timed(request: Request, phase: str):
+    """Add the duration of the block to the request's timings, if tracked."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = getattr(request.state, "timings", None)
+        if timings is not None:
+            timings.add(phase, time.perf_counter() - started)
+
+
+class MetricsMiddleware:
+    """
+    Records per-route request counts, status classes and latency histograms
+    and adds a Server-Timing header listing the phases finished before the
+    response headers went out.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        scope.setdefault("state", {})["timings"] = timings
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            REQUESTS.inc(route, scope["method"], status_class(status_code))
+            REQUEST_DURATION.observe(route, value=time.perf_counter() - timings.started)
+            for phase, seconds in timings.phases.items():
+                PHASE_DURATION.observe(route, phase, value=seconds)
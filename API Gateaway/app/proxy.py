@@ -1,5 +1,22 @@
+import asyncio
+import time
+
 import httpx
-from fastapi import Request, Response
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.balancer import Replica, get_pool
+from app.circuit import get_breaker, get_bulkhead
+from app.clients import get_client
+from app.config import (
+    DEADLINE_HEADER,
+    HEDGE_SERVICES,
+    PROXY_BUFFER_LIMIT,
+    UPSTREAM_NAMES,
+    UPSTREAM_TOTAL_BUDGET,
+)
+from app.hedging import get_budget, get_tracker
+from app.metrics import HEDGES, UPSTREAM_DURATION, UPSTREAM_REQUESTS, status_class, timed
 
 # Remove hop-by-hop headers so we do not forward connection-specific metadata
 HOP_BY_HOP_HEADERS = {
@@ -13,6 +30,9 @@ HOP_BY_HOP_HEADERS = {
     "upgrade",
 }
 
+# Methods that never carry a request body worth streaming
+BODYLESS_METHODS = {"GET", "HEAD", "OPTIONS", "DELETE"}
+
 
 def _filter_headers(headers) -> dict:
     return {
@@ -22,7 +42,160 @@ def _filter_headers(headers) -> dict:
     }
 
 
-async def proxy_request(service_url: str, request: Request) -> Response:
+def _content_length(headers) -> int | None:
+    try:
+        return int(headers["content-length"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _exceeds_buffer_limit(headers) -> bool:
+    length = _content_length(headers)
+    return length is None or length > PROXY_BUFFER_LIMIT
+
+
+def _deadline(request: Request) -> float:
+    """
+    Absolute deadline to forward upstream: the caller's, if it sent one,
+    but never later than now + UPSTREAM_TOTAL_BUDGET. Upstreams only
+    enforce it until the response starts, so streamed bodies may run longer.
+    """
+    deadline = time.time() + UPSTREAM_TOTAL_BUDGET
+    incoming = request.headers.get(DEADLINE_HEADER)
+    if incoming:
+        try:
+            deadline = min(deadline, float(incoming))
+        except ValueError:
+            pass
+    if deadline <= time.time():
+        raise HTTPException(status_code=504, detail="Deadline exceeded")
+    return deadline
+
+
+async def _send(replica: Replica | None, pool, upstream: str, build) -> tuple[Replica, httpx.Response]:
+    """One attempt against one replica: circuit, metrics and error mapping."""
+    if replica is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Upstream unavailable",
+            headers={"Retry-After": str(pool.retry_after())},
+        )
+    breaker = get_breaker(replica.url)
+    # choose() skips replicas whose circuit is unavailable, but a hedged
+    # attempt runs later than its choose(), so the circuit may have opened
+    # (or filled its half-open probes) in between
+    if not breaker.allow_request():
+        raise HTTPException(
+            status_code=503,
+            detail="Upstream unavailable",
+            headers={"Retry-After": str(breaker.retry_after())},
+        )
+    replica.acquire()
+
+    upstream_request = build(replica)
+    started = time.monotonic()
+    resp = None
+    ok = None
+    try:
+        resp = await get_client(replica.url).send(upstream_request, stream=True)
+        ok = resp.status_code < 500
+    except httpx.TimeoutException:
+        ok = False
+        raise HTTPException(status_code=504, detail="Upstream timeout")
+    except httpx.TransportError:
+        ok = False
+        raise HTTPException(status_code=502, detail="Upstream unreachable")
+    finally:
+        # A cancelled (losing) hedge leaves ok=None and is not held against the replica
+        elapsed = time.monotonic() - started
+        breaker.record(ok, elapsed)
+        if resp is not None:
+            UPSTREAM_DURATION.observe(upstream, value=elapsed)
+            UPSTREAM_REQUESTS.inc(upstream, status_class(resp.status_code))
+            if upstream_request.method == "GET":
+                get_tracker(upstream).record(elapsed)
+        else:
+            if ok is False:
+                UPSTREAM_DURATION.observe(upstream, value=elapsed)
+                UPSTREAM_REQUESTS.inc(upstream, "error")
+            replica.release()
+    return replica, resp
+
+
+async def _discard(result: tuple[Replica, httpx.Response]) -> None:
+    replica, resp = result
+    await resp.aclose()
+    replica.release()
+
+
+async def _send_hedged(pool, upstream: str, build) -> tuple[Replica, httpx.Response]:
+    """
+    Send to one replica and, if it has not answered within the upstream's
+    recent latency percentile, fire a second attempt (preferably at another
+    replica) and keep whichever good response comes first. Hedges are
+    limited by a per-upstream budget so a slow upstream is not doubled.
+    """
+    budget = get_budget(upstream)
+    budget.earn()
+    first = pool.choose()
+    primary = asyncio.ensure_future(_send(first, pool, upstream, build))
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=get_tracker(upstream).delay)
+    except BaseException:
+        primary.cancel()
+        raise
+    if done or not budget.spend():
+        return await primary
+    HEDGES.inc(upstream)
+    backup = asyncio.ensure_future(_send(pool.choose(exclude=first), pool, upstream, build))
+
+    pending = {primary, backup}
+    spare: list[tuple[Replica, httpx.Response]] = []
+    winner = None
+    error = None
+    try:
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                elif winner is None and task.result()[1].status_code < 500:
+                    winner = task.result()
+                else:
+                    spare.append(task.result())
+        if winner is None:
+            # Both attempts failed: relay the last 5xx if there is one
+            if not spare:
+                raise error
+            winner = spare.pop()
+        return winner
+    finally:
+        for task in pending:
+            task.cancel()
+        for result in spare:
+            await _discard(result)
+
+
+async def proxy_request(
+    service_url: str,
+    request: Request,
+    stream: bool | None = None,
+    hedge: bool | None = None,
+) -> Response:
+    """Forward the request to service_url and relay the upstream response.
+
+    With stream=None small bodies are buffered and large or unsized ones are
+    streamed chunk by chunk in both directions; True/False force either mode.
+
+    The call goes to one replica of the service chosen by its load
+    balancer. Each service has its own bulkhead and each replica its own
+    circuit breaker: when no replica can take the call we fail fast with
+    503 and a Retry-After header.
+
+    GETs to services listed in HEDGE_SERVICES (or any call with hedge=True)
+    are hedged, see _send_hedged. Every call carries a deadline (see
+    _deadline) so the upstream can drop work nobody is waiting for.
+    """
     # Start with client headers minus hop-by-hop ones
     headers = dict(_filter_headers(request.headers))
 
@@ -35,18 +208,99 @@ async def proxy_request(service_url: str, request: Request) -> Response:
         # Forward roles as a simple comma-separated list
         headers["X-User-Roles"] = ",".join(roles)
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        resp = await client.request(
+    stream_body = stream if stream is not None else _exceeds_buffer_limit(request.headers)
+    if stream_body and request.method not in BODYLESS_METHODS:
+        # Forward the body as it arrives; the client's Content-Length (if any)
+        # is kept so the upstream does not see a chunked upload
+        content = request.stream()
+    else:
+        content = await request.body()
+
+    # Forward the deadline in canonical form, replacing the caller's header
+    headers.pop(DEADLINE_HEADER.lower(), None)
+    headers[DEADLINE_HEADER] = f"{_deadline(request):.3f}"
+
+    bulkhead = get_bulkhead(service_url)
+    if not await bulkhead.acquire():
+        raise HTTPException(status_code=503, detail="Upstream busy", headers={"Retry-After": "1"})
+    pool = get_pool(service_url)
+    upstream = UPSTREAM_NAMES.get(service_url, service_url)
+
+    def build(replica: Replica) -> httpx.Request:
+        return get_client(replica.url).build_request(
             method=request.method,
-            url=service_url + request.url.path,
+            url=replica.url + request.url.path,
             params=request.query_params,
-            content=await request.body(),
+            content=content,
             headers=headers,
-            follow_redirects=False,
         )
 
-    return Response(
-        content=resp.content,
+    if hedge is None:
+        hedge = request.method == "GET" and upstream in HEDGE_SERVICES
+    # A streamed upload can only be sent once
+    hedge = hedge and isinstance(content, bytes)
+    try:
+        with timed(request, "upstream"):
+            if hedge:
+                replica, resp = await _send_hedged(pool, upstream, build)
+            else:
+                replica, resp = await _send(pool.choose(), pool, upstream, build)
+    except BaseException:
+        bulkhead.release()
+        raise
+
+    released = False
+
+    async def release() -> None:
+        nonlocal released
+        if not released:
+            released = True
+            # Free the slots before awaiting, so a cancelled close cannot leak them
+            replica.release()
+            bulkhead.release()
+            await resp.aclose()
+
+    stream_response = stream if stream is not None else _exceeds_buffer_limit(resp.headers)
+    if not stream_response:
+        try:
+            with timed(request, "transfer"):
+                # Raw bytes: an upstream-encoded body is relayed as is, matching
+                # its Content-Encoding header, instead of being decoded by httpx
+                body = b"".join([chunk async for chunk in resp.aiter_raw()])
+        finally:
+            await release()
+        return Response(
+            content=body,
+            status_code=resp.status_code,
+            headers=_filter_headers(resp.headers),
+        )
+
+    async def relay():
+        with timed(request, "transfer"):
+            async for chunk in resp.aiter_raw():
+                yield chunk
+
+    # Relay raw upstream bytes; the ASGI send loop applies backpressure. The
+    # upstream connection, replica and bulkhead slot are released when the
+    # response finishes for any reason, including a client that disconnects
+    # before the body iterator is ever started.
+    return _RelayResponse(
+        relay(),
+        release,
         status_code=resp.status_code,
         headers=_filter_headers(resp.headers),
     )
+
+
+class _RelayResponse(StreamingResponse):
+    """StreamingResponse that runs on_close once the ASGI call ends, however it ends."""
+
+    def __init__(self, content, on_close, **kwargs):
+        super().__init__(content, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.on_close()
@@ -0,0 +1,188 @@
+import json
+import math
+import time
+from collections import OrderedDict
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import (
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_MAX_KEYS,
+    RATE_LIMIT_REDIS_URL,
+    RATE_LIMIT_RULES,
+    RATE_LIMIT_TRUST_FORWARDED,
+)
+from app.metrics import Counter, Gauge, register
+from app.security import identify
+
+
+class MemoryBackend:
+    """Token buckets in this process, LRU-bounded to RATE_LIMIT_MAX_KEYS callers."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: float) -> tuple[bool, float]:
+        """Take one token; returns (allowed, tokens left)."""
+        now = time.monotonic()
+        tokens, last = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - last) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            # A bucket idle long enough to be evicted has refilled anyway
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Refill and take atomically on the Redis side, using the server clock so
+# gateway replicas with skewed clocks agree
+_REDIS_TAKE = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBackend:
+    """Token buckets shared by every gateway replica through Redis."""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package") from exc
+        self._errors = (redis.RedisError, OSError)
+        self._redis = redis.from_url(url)
+        self._take = self._redis.register_script(_REDIS_TAKE)
+
+    async def take(self, key: str, rate: float, burst: float) -> tuple[bool, float]:
+        try:
+            allowed, tokens = await self._take(keys=[f"ratelimit:{key}"], args=[rate, burst])
+        except self._errors:
+            # Fail open: losing Redis must not take the gateway down with it
+            return True, burst
+        return bool(allowed), float(tokens)
+
+    def __len__(self) -> int:
+        return 0
+
+
+def _build_backend():
+    if RATE_LIMIT_BACKEND == "redis":
+        return RedisBackend(RATE_LIMIT_REDIS_URL)
+    return MemoryBackend(RATE_LIMIT_MAX_KEYS)
+
+
+backend = _build_backend()
+
+THROTTLED = register(Counter(
+    "gateway_rate_limited_total", "Requests rejected with 429 per rate limit rule", ("rule",),
+))
+register(Gauge(
+    "gateway_rate_limit_buckets", "Token buckets held in this process", (),
+    lambda: [((), len(backend))],
+))
+
+
+def match_rule(method: str, path: str) -> int | None:
+    for index, (rule_method, prefix, _, _) in enumerate(RATE_LIMIT_RULES):
+        if rule_method in ("*", method) and path.startswith(prefix):
+            return index
+    return None
+
+
+def client_ip(scope: Scope) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _headers(rate: float, burst: float, tokens: float) -> list[tuple[bytes, bytes]]:
+    # RateLimit header fields (IETF draft): quota, what is left of it, and
+    # seconds until the bucket is full again
+    window = math.ceil(burst / rate)
+    reset = math.ceil((burst - tokens) / rate)
+    return [
+        (b"ratelimit-limit", str(int(burst)).encode()),
+        (b"ratelimit-remaining", str(int(tokens)).encode()),
+        (b"ratelimit-reset", str(reset).encode()),
+        (b"ratelimit-policy", f"{int(burst)};w={window}".encode()),
+    ]
+
+
+class RateLimitMiddleware:
+    """
+    Token-bucket limit per caller and route rule. The caller is the user id
+    behind the bearer token, or the client IP for anonymous calls such as
+    /auth/login. Over-limit requests get 429 with Retry-After; every limited
+    response carries RateLimit-* headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        index = match_rule(scope["method"], scope["path"])
+        if index is None:
+            await self.app(scope, receive, send)
+            return
+        _, _, rate, burst = RATE_LIMIT_RULES[index]
+
+        state = scope.setdefault("state", {})
+        current = state.get("current_user") or identify(scope)
+        if current is not None:
+            state.update(current_user=current, user_id=current["user_id"], roles=current["roles"])
+            caller = f"user:{current['user_id']}"
+        else:
+            caller = f"ip:{client_ip(scope)}"
+
+        allowed, tokens = await backend.take(f"{index}:{caller}", rate, burst)
+        headers = _headers(rate, burst, tokens)
+        if not allowed:
+            THROTTLED.inc(f"{RATE_LIMIT_RULES[index][0]} {RATE_LIMIT_RULES[index][1]}")
+            body = json.dumps({"detail": "Too many requests"}).encode()
+            retry_after = math.ceil((1 - tokens) / rate)
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": headers + [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(retry_after).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
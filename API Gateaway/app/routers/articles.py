@@ -1,84 +1,166 @@
+import asyncio
+
+import httpx
 from fastapi import APIRouter, Request, HTTPException
 from app.proxy import proxy_request
-from app.config import SERVICE_URLS
+from app.cache import cached_proxy_request, response_cache
+from app.config import SERVICE_URLS, AGGREGATOR_CONCURRENCY, AGGREGATOR_TIMEOUTS, RESPONSE_CACHE_TTLS
 from app.security import get_current_user
-import httpx
+from app.balancer import get_pool
+from app.clients import get_client
 
 router = APIRouter(prefix="/articles")
 
+# Services without a /batch lookup endpoint; we stop trying it against
+# them and fan out per id instead
+_batch_unsupported: set[str] = set()
+
+
+async def _upstream_get(service: str, path: str, **kwargs) -> httpx.Response:
+    """GET from one replica of a service picked by its load balancer."""
+    replica = get_pool(SERVICE_URLS[service]).choose()
+    if replica is None:
+        raise httpx.ConnectError(f"No available replica for {service}")
+    replica.acquire()
+    try:
+        return await get_client(replica.url).get(replica.url + path, **kwargs)
+    finally:
+        replica.release()
+
+
+async def _check_author_access(article_id: int, auth_header: str) -> None:
+    # Verify author access by calling Article Service's /my/{article_id}
+    try:
+        resp = await _upstream_get(
+            "articles",
+            f"/articles/my/{article_id}",
+            headers={"Authorization": auth_header},
+            timeout=AGGREGATOR_TIMEOUTS["articles"],
+        )
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=504, detail="Article service timeout")
+    except httpx.TransportError:
+        raise HTTPException(status_code=502, detail="Article service unreachable")
+    if resp.status_code == 404:
+        raise HTTPException(status_code=404, detail="Article not found")
+    if resp.status_code != 200:
+        # 403 or any other -> forbid
+        raise HTTPException(status_code=403, detail="Access denied")
+
+
+async def _fetch_reviews(article_id: int) -> list[dict]:
+    try:
+        rev_resp = await _upstream_get(
+            "reviews",
+            f"/reviews/article/{article_id}",
+            timeout=AGGREGATOR_TIMEOUTS["reviews"],
+        )
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=504, detail="Review service timeout")
+    except httpx.TransportError:
+        raise HTTPException(status_code=502, detail="Review service unreachable")
+    if rev_resp.status_code == 404:
+        return []
+    if rev_resp.status_code != 200:
+        raise HTTPException(status_code=502, detail="Failed to fetch reviews")
+    return rev_resp.json() or []
+
+
+async def _fetch_users(
+    service: str,
+    path: str,
+    key: str,
+    ids: list[int],
+    semaphore: asyncio.Semaphore,
+) -> tuple[dict[int, dict], bool]:
+    """
+    Look up users by id in one upstream, preferring its /batch endpoint.
+    Returns whatever was found within the source's time budget and a flag
+    telling whether the lookup completed.
+    """
+    found: dict[int, dict] = {}
+
+    async def fetch_one(uid: int) -> None:
+        async with semaphore:
+            resp = await _upstream_get(service, f"{path}/{uid}")
+        if resp.status_code == 200:
+            found[uid] = resp.json()
+
+    async def fetch_all() -> None:
+        if service not in _batch_unsupported:
+            async with semaphore:
+                resp = await _upstream_get(service, f"{path}/batch", params=[("ids", uid) for uid in ids])
+            if resp.status_code == 200:
+                for item in resp.json() or []:
+                    if item.get(key) is not None:
+                        found[int(item[key])] = item
+                return
+            if resp.status_code in (404, 405, 422):
+                _batch_unsupported.add(service)
+        await asyncio.gather(*(fetch_one(uid) for uid in ids), return_exceptions=True)
+
+    try:
+        await asyncio.wait_for(fetch_all(), AGGREGATOR_TIMEOUTS[service])
+        return found, True
+    except (asyncio.TimeoutError, httpx.HTTPError):
+        return found, False
+
+
 @router.get("/{article_id}/reviewers")
 async def get_article_reviewers(article_id: int, request: Request):
     """
     Aggregated endpoint: returns reviewers assigned to an article with deadlines.
     Access: editor or the article's responsible author.
+    Independent upstream calls run concurrently; if profile or auth lookups
+    miss their time budget the response is returned with "partial": true.
     """
     # Validate JWT and get roles
     current = await get_current_user(request)
 
-    # Authorization: allow editors; else verify responsible author via Articles service
-    if "editor" not in (current.get("roles") or []):
-        # Verify author access by calling Article Service's /my/{article_id}
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            raise HTTPException(status_code=401, detail="Missing Authorization header")
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(
-                f"{SERVICE_URLS['articles']}/articles/my/{article_id}",
-                headers={"Authorization": auth_header},
-            )
-        if resp.status_code == 404:
-            raise HTTPException(status_code=404, detail="Article not found")
-        if resp.status_code != 200:
-            # 403 or any other -> forbid
-            raise HTTPException(status_code=403, detail="Access denied")
-
-    # Fetch reviews for article
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        rev_resp = await client.get(f"{SERVICE_URLS['reviews']}/reviews/article/{article_id}")
-    if rev_resp.status_code == 404:
-        reviews = []
-    elif rev_resp.status_code != 200:
-        raise HTTPException(status_code=502, detail="Failed to fetch reviews")
-    else:
-        reviews = rev_resp.json() or []
+    # Reviews do not depend on the access check, so fetch them meanwhile
+    reviews_task = asyncio.create_task(_fetch_reviews(article_id))
+    try:
+        # Authorization: allow editors; else verify responsible author via Articles service
+        if "editor" not in (current.get("roles") or []):
+            auth_header = request.headers.get("Authorization")
+            if not auth_header:
+                raise HTTPException(status_code=401, detail="Missing Authorization header")
+            await _check_author_access(article_id, auth_header)
+        reviews = await reviews_task
+    finally:
+        reviews_task.cancel()
 
     # Enrich reviewers with full info
     unique_ids = sorted({r.get("reviewer_id") for r in reviews if r.get("reviewer_id") is not None})
     profiles: dict[int, dict] = {}
+    partial = False
     if unique_ids:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            for uid in unique_ids:
-                prof = None
-                auth = None
-                try:
-                    p = await client.get(f"{SERVICE_URLS['users']}/users/{uid}")
-                    if p.status_code == 200:
-                        prof = p.json()
-                except Exception:
-                    prof = None
-                try:
-                    a = await client.get(f"{SERVICE_URLS['auth']}/auth/users/{uid}")
-                    if a.status_code == 200:
-                        auth = a.json()
-                except Exception:
-                    auth = None
-
-                merged = {
-                    "id": (prof or {}).get("id"),
-                    "user_id": uid,
-                    "full_name": (prof or {}).get("full_name") or (auth or {}).get("full_name"),
-                    "phone": (prof or {}).get("phone"),
-                    "organization": (prof or {}).get("organization") or (auth or {}).get("organization"),
-                    "roles": (prof or {}).get("roles", []),
-                    "preferred_language": (prof or {}).get("preferred_language"),
-                    "is_active": (auth or {}).get("is_active"),
-                    "username": (auth or {}).get("username"),
-                    "email": (auth or {}).get("email"),
-                    "first_name": (auth or {}).get("first_name"),
-                    "last_name": (auth or {}).get("last_name"),
-                    "institution": (auth or {}).get("institution"),
-                }
-                profiles[uid] = merged
+        semaphore = asyncio.Semaphore(AGGREGATOR_CONCURRENCY)
+        (users_found, users_complete), (auth_found, auth_complete) = await asyncio.gather(
+            _fetch_users("users", "/users", "user_id", unique_ids, semaphore),
+            _fetch_users("auth", "/auth/users", "id", unique_ids, semaphore),
+        )
+        partial = not (users_complete and auth_complete)
+
+        for uid in unique_ids:
+            prof = users_found.get(uid)
+            auth = auth_found.get(uid)
+            merged = {
+                "id": (prof or {}).get("id"),
+                "user_id": uid,
+                "full_name": (prof or {}).get("full_name") or (auth or {}).get("full_name"),
+                "phone": (prof or {}).get("phone"),
+                "organization": (prof or {}).get("organization") or (auth or {}).get("organization"),
+                "roles": (prof or {}).get("roles", []),
+                "preferred_language": (prof or {}).get("preferred_language"),
+                "is_active": (auth or {}).get("is_active"),
+                "username": (auth or {}).get("username"),
+                "email": (auth or {}).get("email"),
+                "first_name": (auth or {}).get("first_name"),
+                "last_name": (auth or {}).get("last_name"),
+                "institution": (auth or {}).get("institution"),
+            }
+            profiles[uid] = merged
 
     result_reviews = []
     for r in reviews:
@@ -90,8 +172,22 @@ async def get_article_reviewers(article_id: int, request: Request):
             "reviewer": profiles.get(r.get("reviewer_id"))
         })
 
-    return {"article_id": article_id, "reviews": result_reviews}
+    return {"article_id": article_id, "reviews": result_reviews, "partial": partial}
+
+@router.api_route("/keywords", methods=["GET", "POST"])
+async def keywords(request: Request):
+    return await cached_proxy_request(
+        SERVICE_URLS["articles"],
+        request,
+        ttl=RESPONSE_CACHE_TTLS["keywords"],
+        invalidates=("/articles/keywords",),
+    )
+
 
 @router.api_route("/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
 async def proxy(path: str, request: Request):
-    return await proxy_request(SERVICE_URLS["articles"], request)
+    response = await proxy_request(SERVICE_URLS["articles"], request)
+    if request.method != "GET" and response.status_code < 400:
+        # Volumes embed their articles, so article writes make them stale
+        response_cache.invalidate("/volumes")
+    return response
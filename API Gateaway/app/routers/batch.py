@@ -0,0 +1,162 @@
+import asyncio
+import json
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel
+
+from app.config import BATCH_MAX_REQUESTS, BATCH_CONCURRENCY, BATCH_MAX_RESPONSE_BYTES
+from app.security import get_current_user
+
+router = APIRouter()
+
+ALLOWED_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+
+
+class SubRequest(BaseModel):
+    # Client-chosen identifier echoed back in the matching response
+    id: str | None = None
+    method: str = "GET"
+    # Gateway path including any query string, e.g. "/articles/editor/5"
+    path: str
+    headers: dict[str, str] = {}
+    # JSON body for POST/PUT/PATCH
+    body: Any = None
+
+
+class BatchRequest(BaseModel):
+    requests: list[SubRequest]
+
+
+def _validate(sub: SubRequest) -> None:
+    if sub.method.upper() not in ALLOWED_METHODS:
+        raise HTTPException(status_code=400, detail=f"Method not allowed in batch: {sub.method}")
+    if not sub.path.startswith("/") or sub.path.split("?")[0].rstrip("/") == "/batch":
+        raise HTTPException(status_code=400, detail=f"Invalid batch path: {sub.path}")
+
+
+async def _dispatch(request: Request, sub: SubRequest, current: dict) -> dict:
+    """Run one sub-request through the gateway's own ASGI app."""
+    parent = request.scope
+    path, _, query = sub.path.partition("?")
+    body = b"" if sub.body is None else json.dumps(sub.body).encode()
+
+    headers = [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in sub.headers.items()
+        if name.lower() not in ("authorization", "content-length", "host", "accept-encoding")
+    ]
+    headers.append((b"host", request.headers.get("host", "gateway").encode("latin-1")))
+    headers.append((b"authorization", request.headers["authorization"].encode("latin-1")))
+    if body:
+        headers.append((b"content-length", str(len(body)).encode()))
+        if not any(name == b"content-type" for name, _ in headers):
+            headers.append((b"content-type", b"application/json"))
+
+    # The JWT was verified once for the whole batch; seeding the state makes
+    # get_current_user return it without decoding again
+    state = {
+        **parent.get("state", {}),
+        "current_user": current,
+        "user_id": current["user_id"],
+        "roles": current["roles"],
+    }
+    state.pop("timings", None)
+    scope = {
+        "type": "http",
+        "asgi": parent.get("asgi", {"version": "3.0"}),
+        "http_version": parent.get("http_version", "1.1"),
+        "method": sub.method.upper(),
+        "scheme": parent.get("scheme", "http"),
+        "server": parent.get("server"),
+        "client": parent.get("client"),
+        "root_path": parent.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": headers,
+        "state": state,
+    }
+
+    request_sent = False
+    finished = asyncio.Event()
+    status_code = 500
+    response_headers: list[tuple[bytes, bytes]] = []
+    chunks: list[bytes] = []
+    size = 0
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status_code, response_headers, size
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            response_headers = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size <= BATCH_MAX_RESPONSE_BYTES:
+                chunks.append(chunk)
+            if not message.get("more_body", False):
+                finished.set()
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # The app has already logged the error and, if it could, sent a 500
+        status_code = 500
+        chunks.clear()
+    finally:
+        finished.set()
+
+    result = {
+        "id": sub.id,
+        "status": status_code,
+        "headers": {name.decode("latin-1"): value.decode("latin-1") for name, value in response_headers},
+    }
+    if size > BATCH_MAX_RESPONSE_BYTES:
+        result["error"] = "Response too large for batch; request it directly"
+        return result
+    raw = b"".join(chunks)
+    content_type = result["headers"].get("content-type", "")
+    result["body"] = raw.decode("utf-8", errors="replace") if raw else None
+    if raw and "json" in content_type:
+        try:
+            result["body"] = json.loads(raw)
+        except ValueError:
+            pass
+    return result
+
+
+@router.post("/batch")
+async def batch(payload: BatchRequest, request: Request, current=Depends(get_current_user)):
+    """
+    Run several gateway requests in one round trip.
+
+    Sub-requests go through the normal gateway routing (admission, cache,
+    circuit breakers, metrics) concurrently and share the caller's already
+    verified JWT. Each sub-request is admitted on its own, so one that is
+    shed comes back as a 503 entry. Responses come back in request order in
+    one envelope.
+    """
+    if not payload.requests:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if len(payload.requests) > BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_REQUESTS} requests per batch")
+    for sub in payload.requests:
+        _validate(sub)
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run(sub: SubRequest) -> dict:
+        async with semaphore:
+            return await _dispatch(request, sub, current)
+
+    responses = await asyncio.gather(*(run(sub) for sub in payload.requests))
+    return {"responses": responses}
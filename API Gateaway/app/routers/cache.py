@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Header, HTTPException
+from pydantic import BaseModel
+
+from app.cache import response_cache
+from app.config import SHARED_SERVICE_SECRET
+
+router = APIRouter(prefix="/cache")
+
+
+class InvalidateRequest(BaseModel):
+    # Path prefixes to purge, e.g. ["/volumes"]; an empty list purges everything
+    prefixes: list[str] = []
+
+
+@router.post("/invalidate")
+async def invalidate(
+    payload: InvalidateRequest,
+    x_service_secret: str | None = Header(default=None, alias="X-Service-Secret"),
+):
+    """Internal hook for upstream services to purge cached gateway responses."""
+    if not x_service_secret or x_service_secret != SHARED_SERVICE_SECRET:
+        raise HTTPException(status_code=403, detail="Invalid service secret")
+    prefixes = payload.prefixes or [""]
+    removed = sum(response_cache.invalidate(prefix) for prefix in prefixes)
+    return {"invalidated": removed}
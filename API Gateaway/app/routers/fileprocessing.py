@@ -6,4 +6,5 @@ router = APIRouter(prefix="/files")
 
 @router.api_route("/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
 async def proxy(path: str, request: Request):
-    return await proxy_request(SERVICE_URLS["files"], request)
+    # Manuscripts can be hundreds of MB; never buffer them in the gateway
+    return await proxy_request(SERVICE_URLS["files"], request, stream=True)
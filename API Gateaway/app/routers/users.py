@@ -1,11 +1,20 @@
 from fastapi import APIRouter, Depends, Request
 from app.proxy import proxy_request
-from app.config import SERVICE_URLS
+from app.cache import cached_proxy_request
+from app.config import SERVICE_URLS, RESPONSE_CACHE_TTLS
 from app.security import get_current_user
 
 router = APIRouter(prefix="/users")
 
 
+@router.get("/reviewers")
+async def reviewers(request: Request, current_user=Depends(get_current_user)):
+    # Editor-only list shared by every editor; cached per role set
+    return await cached_proxy_request(
+        SERVICE_URLS["users"], request, ttl=RESPONSE_CACHE_TTLS["reviewers"]
+    )
+
+
 @router.api_route(
     "/{path:path}",
     methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
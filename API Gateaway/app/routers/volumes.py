@@ -1,10 +1,17 @@
 from fastapi import APIRouter, Request
-from app.proxy import proxy_request
-from app.config import SERVICE_URLS
+from app.cache import cached_proxy_request
+from app.config import SERVICE_URLS, RESPONSE_CACHE_TTLS
 
 router = APIRouter(prefix="/volumes")
 
 @router.api_route("/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
 async def proxy(path: str, request: Request):
-    # Forward to Article Management Service which hosts /volumes
-    return await proxy_request(SERVICE_URLS["articles"], request)
+    # Forward to Article Management Service which hosts /volumes.
+    # Volumes are the same for every user of a role, so GETs are cached
+    # and any successful write purges them.
+    return await cached_proxy_request(
+        SERVICE_URLS["articles"],
+        request,
+        ttl=RESPONSE_CACHE_TTLS["volumes"],
+        invalidates=("/volumes",),
+    )
@@ -1,11 +1,110 @@
+import hashlib
+import time
+from collections import OrderedDict
+
 from fastapi import HTTPException, Request
 from jose import jwt, JWTError
 
-from app.config import SECRET_KEY, ALGORITHM
+from app.config import SECRET_KEY, ALGORITHM, JWT_CACHE_SIZE, JWT_CACHE_MAX_TTL
+from app.metrics import Gauge, register, timed
+
+
+class TokenCache:
+    """Bounded LRU of verified JWT claims, keyed by a digest of the token.
+
+    Entries expire at the token's exp (capped by max_ttl), so a cached token
+    is never accepted after jwt.decode itself would have rejected it.
+    """
+
+    def __init__(self, maxsize: int, max_ttl: float):
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, claims = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return claims
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, token: str, claims: dict) -> None:
+        if self.maxsize <= 0:
+            return
+        now = time.time()
+        expires_at = now + self.max_ttl
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= now:
+            return
+        key = self._key(token)
+        self._entries[key] = (expires_at, claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache(JWT_CACHE_SIZE, JWT_CACHE_MAX_TTL)
+
+register(Gauge(
+    "gateway_jwt_cache", "Verified-JWT cache size and lookups", ("kind",),
+    lambda: [((kind,), value) for kind, value in token_cache.stats().items()],
+))
+
+
+def _decode_token(token: str) -> dict:
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        token_cache.put(token, payload)
+    return payload
+
+
+def identify(scope) -> dict | None:
+    """
+    Best-effort caller lookup for ASGI middleware: the user behind a valid
+    bearer token, or None for anonymous or invalid credentials (the route's
+    own get_current_user dependency still rejects those).
+    """
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token.strip():
+                return None
+            try:
+                payload = _decode_token(token.strip())
+                return {"user_id": int(payload["sub"]), "roles": payload.get("roles", [])}
+            except (JWTError, KeyError, TypeError, ValueError):
+                return None
+    return None
 
 
 async def get_current_user(request: Request):
     """Validate JWT from Authorization header and attach user info to request.state."""
+    # Memoized per request: routers and aggregators may call this repeatedly
+    current = getattr(request.state, "current_user", None)
+    if current is not None:
+        return current
+
     auth_header = request.headers.get("Authorization")
     if not auth_header:
         raise HTTPException(status_code=401, detail="Missing Authorization header")
@@ -19,7 +118,8 @@ async def get_current_user(request: Request):
         raise HTTPException(status_code=401, detail="Invalid authorization scheme")
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with timed(request, "jwt"):
+            payload = _decode_token(token)
         user_id = payload.get("sub")
         roles = payload.get("roles", [])
         if user_id is None:
@@ -29,7 +129,8 @@ async def get_current_user(request: Request):
         request.state.user_id = int(user_id)
         request.state.roles = roles
 
-        return {"user_id": int(user_id), "roles": roles}
+        current = {"user_id": int(user_id), "roles": roles}
+        request.state.current_user = current
+        return current
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
-
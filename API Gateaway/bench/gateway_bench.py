@@ -0,0 +1,251 @@
+"""
+Gateway overhead benchmark.
+
+Runs the gateway app in process against stub upstreams that answer after a
+fixed latency with a payload of a given size, drives a weighted mix of
+requests through the /articles, /files, /users and /reviews routers at a
+fixed concurrency and writes throughput, latency percentiles and per-request
+allocations to a JSON file.
+
+Both hops use httpx's ASGI transport, so the numbers are the gateway's own
+CPU cost per request (routing, auth, proxying, middleware) without sockets.
+Run from the gateway directory:
+
+    python bench/gateway_bench.py --requests 5000 --concurrency 50 \
+        --output bench/results/$(git rev-parse --short HEAD).json \
+        --compare bench/results/<baseline>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Rate limiting would throttle the single benchmark user and health checks
+# would probe the stubs; both are off unless set explicitly
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("HEALTH_CHECK_ENABLED", "false")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+from jose import jwt  # noqa: E402
+
+from app import clients  # noqa: E402
+from app.config import ALGORITHM, SECRET_KEY  # noqa: E402
+from app.main import app  # noqa: E402
+
+# name, weight, method, path, request body
+SCENARIOS = [
+    ("articles_list", 4, "GET", "/articles/unassigned?search=graph&limit=20", None),
+    ("articles_create", 1, "POST", "/articles/", {"title": "Bench", "abstract": "x" * 512, "keywords": ["a", "b"]}),
+    ("users_get", 2, "GET", "/users/42", None),
+    ("users_reviewers", 2, "GET", "/users/reviewers", None),
+    ("reviews_list", 2, "GET", "/reviews/article/1", None),
+    ("files_download", 1, "GET", "/files/manuscript.pdf", None),
+]
+
+
+def stub_upstream(latency: float, payload_bytes: int, file_bytes: int, chunk_bytes: int = 64 * 1024):
+    """Raw ASGI upstream: JSON of about payload_bytes, or a chunked file under /files."""
+    item = {"id": 1, "title": "Stub article", "authors": ["A. Author"], "keywords": ["stub"]}
+    count = max(1, payload_bytes // len(json.dumps(item)))
+    body = json.dumps([item] * count).encode()
+    chunk = b"\0" * chunk_bytes
+
+    async def upstream(scope, receive, send):
+        while True:
+            message = await receive()
+            if not message.get("more_body", False):
+                break
+        await asyncio.sleep(latency)
+        if scope["path"].startswith("/files"):
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/pdf"), (b"content-length", str(file_bytes).encode())],
+            })
+            remaining = file_bytes
+            while remaining > 0:
+                part = chunk[:min(chunk_bytes, remaining)]
+                remaining -= len(part)
+                await send({"type": "http.response.body", "body": part, "more_body": remaining > 0})
+            return
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    return upstream
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summary(latencies: list[float], errors: int, elapsed: float | None = None) -> dict:
+    ordered = sorted(latencies)
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(_percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(_percentile(ordered, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3) if ordered else 0.0,
+    }
+    if elapsed is not None:
+        result["throughput_rps"] = round(len(latencies) / elapsed, 1)
+    return result
+
+
+async def _call(client: httpx.AsyncClient, scenario) -> tuple[float, bool]:
+    _, _, method, path, body = scenario
+    started = time.perf_counter()
+    async with client.stream(method, path, json=body) as resp:
+        async for _ in resp.aiter_raw():
+            pass
+    return time.perf_counter() - started, resp.status_code < 400
+
+
+async def _load(client: httpx.AsyncClient, total: int, concurrency: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    weights = [scenario[1] for scenario in SCENARIOS]
+    plan = rng.choices(SCENARIOS, weights=weights, k=total)
+    latencies: dict[str, list[float]] = {scenario[0]: [] for scenario in SCENARIOS}
+    errors: dict[str, int] = {scenario[0]: 0 for scenario in SCENARIOS}
+    queue = iter(plan)
+
+    async def worker():
+        for scenario in queue:
+            latency, ok = await _call(client, scenario)
+            latencies[scenario[0]].append(latency)
+            if not ok:
+                errors[scenario[0]] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    everything = [value for values in latencies.values() for value in values]
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "overall": _summary(everything, sum(errors.values()), elapsed),
+        "routes": {name: _summary(values, errors[name]) for name, values in latencies.items() if values},
+    }
+
+
+async def _allocations(client: httpx.AsyncClient, repeat: int) -> dict:
+    """Peak bytes allocated while serving one request, per scenario (run sequentially)."""
+    result = {}
+    tracemalloc.start()
+    try:
+        for scenario in SCENARIOS:
+            await _call(client, scenario)  # warm caches and pools first
+            peaks = []
+            for _ in range(repeat):
+                baseline, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                await _call(client, scenario)
+                _, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - baseline)
+            result[scenario[0]] = {"peak_alloc_bytes": int(statistics.median(peaks))}
+    finally:
+        tracemalloc.stop()
+    return result
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent, text=True, stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(current: dict, baseline: dict) -> None:
+    print(f"{'route':<18}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>10}")
+    rows = [("overall", current["load"]["overall"], baseline["load"]["overall"])]
+    rows += [
+        (name, stats, baseline["load"]["routes"].get(name))
+        for name, stats in current["load"]["routes"].items()
+    ]
+    for name, now, before in rows:
+        if not before:
+            continue
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            if metric in now and before.get(metric):
+                change = (now[metric] - before[metric]) / before[metric] * 100
+                print(f"{name:<18}{metric:<16}{before[metric]:>12}{now[metric]:>12}{change:>+9.1f}%")
+
+
+async def main(args) -> dict:
+    token = jwt.encode(
+        {"sub": "1", "roles": ["author", "editor"], "exp": time.time() + 3600}, SECRET_KEY, algorithm=ALGORITHM,
+    )
+    upstream = stub_upstream(args.latency_ms / 1000, args.payload_kb * 1024, args.file_kb * 1024)
+
+    async with app.router.lifespan_context(app):
+        # Swap every pooled upstream client for one wired to the stub
+        for url, client in list(clients._clients.items()):
+            await client.aclose()
+            clients._clients[url] = httpx.AsyncClient(transport=httpx.ASGITransport(app=upstream))
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://gateway",
+            headers={"Authorization": f"Bearer {token}", "Accept-Encoding": args.accept_encoding},
+            timeout=60,
+        ) as client:
+            await _load(client, min(args.requests, 200), args.concurrency, args.seed + 1)  # warm-up
+            load = await _load(client, args.requests, args.concurrency, args.seed)
+            allocations = await _allocations(client, args.alloc_repeat)
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": sys.version.split()[0],
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "upstream_latency_ms": args.latency_ms,
+            "payload_kb": args.payload_kb,
+            "file_kb": args.file_kb,
+            "accept_encoding": args.accept_encoding,
+            "seed": args.seed,
+        },
+        "load": load,
+        "allocations": allocations,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="stub upstream latency")
+    parser.add_argument("--payload-kb", type=int, default=16, help="stub JSON response size")
+    parser.add_argument("--file-kb", type=int, default=1024, help="stub /files response size")
+    parser.add_argument("--accept-encoding", default="identity", help="e.g. gzip to include compression cost")
+    parser.add_argument("--alloc-repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(json.dumps(results["load"]["overall"]))
+    if args.compare:
+        _compare(results, json.loads(Path(args.compare).read_text()))
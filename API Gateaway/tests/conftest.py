@@ -0,0 +1,69 @@
+"""
+Gateway test fixtures.
+
+The gateway app runs in process through Starlette's TestClient and every
+pooled upstream client is replaced by one that sends requests to a raw ASGI
+stub, which records what it received. Rate limiting and health checks are
+off unless set explicitly.
+"""
+import os
+
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("HEALTH_CHECK_ENABLED", "false")
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from jose import jwt  # noqa: E402
+
+from app import clients  # noqa: E402
+from app.config import ALGORITHM, SECRET_KEY, SERVICE_REPLICAS  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+class StubUpstream:
+    """Raw ASGI upstream answering every request with a fixed JSON body."""
+
+    def __init__(self):
+        self.requests: list[dict] = []
+        self.status = 200
+        self.body = b"[]"
+        self.headers: list[tuple[bytes, bytes]] = []
+
+    async def __call__(self, scope, receive, send):
+        while (await receive()).get("more_body", False):
+            pass
+        self.requests.append({
+            "method": scope["method"],
+            "path": scope["path"],
+            "headers": {name.decode(): value.decode() for name, value in scope["headers"]},
+        })
+        await send({
+            "type": "http.response.start",
+            "status": self.status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(self.body)).encode()),
+                *self.headers,
+            ],
+        })
+        await send({"type": "http.response.body", "body": self.body})
+
+
+@pytest.fixture
+def upstream():
+    return StubUpstream()
+
+
+@pytest.fixture
+def gateway(upstream):
+    with TestClient(app) as client:
+        for urls in SERVICE_REPLICAS.values():
+            for url in urls:
+                clients._clients[url] = httpx.AsyncClient(transport=httpx.ASGITransport(app=upstream))
+        yield client
+
+
+def auth(user_id: int = 1, *roles: str) -> dict:
+    token = jwt.encode({"sub": str(user_id), "roles": list(roles) or ["author"]}, SECRET_KEY, algorithm=ALGORITHM)
+    return {"Authorization": f"Bearer {token}"}
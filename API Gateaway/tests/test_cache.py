@@ -0,0 +1,60 @@
+import pytest
+
+from app.cache import response_cache
+from tests.conftest import auth
+
+PATH = "/volumes/"
+
+
+def _vary(response) -> list[str]:
+    (vary,) = response.headers.get_list("vary")
+    return [field.strip() for field in vary.split(",")]
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    response_cache.invalidate()
+    yield
+    response_cache.invalidate()
+
+
+def test_not_modified_carries_vary_and_cache_control(gateway, upstream):
+    upstream.headers = [(b"cache-control", b"private, max-age=30")]
+    first = gateway.get(PATH, headers=auth(1, "editor"))
+
+    second = gateway.get(PATH, headers={**auth(1, "editor"), "If-None-Match": first.headers["etag"]})
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    for response in (first, second):
+        assert _vary(response).count("Accept-Encoding") == 1
+        assert response.headers.get_list("cache-control") == ["private, max-age=30"]
+    assert second.headers["etag"] == first.headers["etag"]
+    assert len(upstream.requests) == 1
+
+
+def test_upstream_vary_is_kept(gateway, upstream):
+    upstream.headers = [(b"vary", b"Accept-Language")]
+
+    response = gateway.get(PATH, headers=auth(1, "editor"))
+
+    assert _vary(response)[:2] == ["Accept-Language", "Accept-Encoding"]
+
+
+def test_entries_are_split_by_accept_encoding(gateway, upstream):
+    gateway.get(PATH, headers={**auth(1, "editor"), "Accept-Encoding": "gzip"})
+    gateway.get(PATH, headers={**auth(1, "editor"), "Accept-Encoding": "identity"})
+    hit = gateway.get(PATH, headers={**auth(1, "editor"), "Accept-Encoding": "gzip"})
+
+    assert len(upstream.requests) == 2
+    assert hit.headers["x-cache"] == "HIT"
+
+
+def test_compressed_hit_lists_accept_encoding_once(gateway, upstream):
+    upstream.body = b"[" + b",".join([b'{"title": "Volume"}'] * 200) + b"]"
+    gateway.get(PATH, headers={**auth(1, "editor"), "Accept-Encoding": "gzip"})
+
+    hit = gateway.get(PATH, headers={**auth(1, "editor"), "Accept-Encoding": "gzip"})
+
+    assert hit.headers["content-encoding"] == "gzip"
+    assert _vary(hit).count("Accept-Encoding") == 1
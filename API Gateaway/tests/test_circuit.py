@@ -0,0 +1,62 @@
+from app import circuit
+from app.balancer import get_pool
+from app.circuit import get_breaker, get_bulkhead
+from app.config import SERVICE_URLS
+
+PATH = "/reviews/article/1"
+
+
+def _replicas():
+    return get_pool(SERVICE_URLS["reviews"]).replicas
+
+
+def test_open_circuit_rejects_call_chosen_before_it_opened(gateway, upstream, monkeypatch):
+    pool = get_pool(SERVICE_URLS["reviews"])
+    chosen = pool.choose
+
+    def choose_then_open(exclude=None):
+        # The replica is picked while its circuit is closed, then it opens
+        # before the attempt runs, as with a delayed hedge
+        replica = chosen(exclude)
+        get_breaker(replica.url)._open()
+        return replica
+
+    monkeypatch.setattr(pool, "choose", choose_then_open)
+    bulkhead = get_bulkhead(SERVICE_URLS["reviews"])
+    try:
+        response = gateway.get(PATH)
+    finally:
+        for replica in _replicas():
+            get_breaker(replica.url)._close()
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert upstream.requests == []
+    assert all(replica.outstanding == 0 for replica in _replicas())
+    assert bulkhead.in_flight == 0
+
+
+def test_full_half_open_probes_reject_call(gateway, upstream, monkeypatch):
+    monkeypatch.setattr(circuit, "CIRCUIT_HALF_OPEN_CALLS", 1)
+    breakers = [get_breaker(replica.url) for replica in _replicas()]
+    for breaker in breakers:
+        breaker.state = circuit.HALF_OPEN
+        breaker._probes_in_flight = 1
+    pool = get_pool(SERVICE_URLS["reviews"])
+    # choose() would skip these replicas; hand one over as a stale choice
+    monkeypatch.setattr(pool, "choose", lambda exclude=None: _replicas()[0])
+    try:
+        response = gateway.get(PATH)
+    finally:
+        for breaker in breakers:
+            breaker._close()
+            breaker._probes_in_flight = 0
+
+    assert response.status_code == 503
+    assert upstream.requests == []
+    assert _replicas()[0].outstanding == 0
+
+
+def test_closed_circuit_admits_call(gateway, upstream):
+    assert gateway.get(PATH).status_code == 200
+    assert len(upstream.requests) == 1
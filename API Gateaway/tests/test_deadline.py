@@ -0,0 +1,47 @@
+import time
+
+import pytest
+
+from app.config import UPSTREAM_TOTAL_BUDGET
+
+PATH = "/reviews/article/1"
+
+
+def _forwarded(upstream) -> float:
+    return float(upstream.requests[-1]["headers"]["x-request-deadline"])
+
+
+def test_deadline_is_stamped_without_caller_header(gateway, upstream):
+    before = time.time()
+    response = gateway.get(PATH)
+
+    assert response.status_code == 200
+    deadline = _forwarded(upstream)
+    assert before < deadline <= time.time() + UPSTREAM_TOTAL_BUDGET
+
+
+def test_earlier_caller_deadline_is_kept(gateway, upstream):
+    deadline = time.time() + UPSTREAM_TOTAL_BUDGET / 2
+
+    gateway.get(PATH, headers={"X-Request-Deadline": str(deadline)})
+
+    assert _forwarded(upstream) == pytest.approx(deadline, abs=0.001)
+
+
+def test_later_caller_deadline_is_capped_to_budget(gateway, upstream):
+    gateway.get(PATH, headers={"X-Request-Deadline": str(time.time() + UPSTREAM_TOTAL_BUDGET * 10)})
+
+    assert _forwarded(upstream) <= time.time() + UPSTREAM_TOTAL_BUDGET
+
+
+def test_unparsable_caller_deadline_falls_back_to_budget(gateway, upstream):
+    gateway.get(PATH, headers={"X-Request-Deadline": "soon"})
+
+    assert time.time() < _forwarded(upstream) <= time.time() + UPSTREAM_TOTAL_BUDGET
+
+
+def test_expired_caller_deadline_is_rejected(gateway, upstream):
+    response = gateway.get(PATH, headers={"X-Request-Deadline": str(time.time() - 1)})
+
+    assert response.status_code == 504
+    assert upstream.requests == []
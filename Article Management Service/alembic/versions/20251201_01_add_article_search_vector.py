@@ -0,0 +1,52 @@
+"""Add trilingual full-text search vector to articles
+
+Revision ID: 20251201_01
+Revises: 20251130_04
+Create Date: 2025-12-01
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '20251201_01'
+down_revision = '20251130_04'
+branch_labels = None
+depends_on = None
+
+# PostgreSQL has no Kazakh configuration, so KZ text is indexed with 'simple'
+# (lower-cased, unstemmed). Titles weigh more than abstracts for ts_rank.
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(title_kz, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(title_en, '')), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(title_ru, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(abstract_kz, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(abstract_en, '')), 'B') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(abstract_ru, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    # Generated column: PostgreSQL keeps it in sync on every insert/update
+    op.add_column(
+        'articles',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        'ix_articles_search_vector',
+        'articles',
+        ['search_vector'],
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_articles_search_vector', table_name='articles')
+    op.drop_column('articles', 'search_vector')
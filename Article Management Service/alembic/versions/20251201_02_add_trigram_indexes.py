@@ -0,0 +1,44 @@
+"""Add pg_trgm indexes for author name and keyword filters
+
+Revision ID: 20251201_02
+Revises: 20251201_01
+Create Date: 2025-12-01
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251201_02'
+down_revision = '20251201_01'
+branch_labels = None
+depends_on = None
+
+# GIN trigram indexes let PostgreSQL serve ILIKE '%x%' without a full scan
+TRIGRAM_INDEXES = [
+    ('ix_authors_first_name_trgm', 'authors', 'first_name'),
+    ('ix_authors_last_name_trgm', 'authors', 'last_name'),
+    ('ix_authors_patronymic_trgm', 'authors', 'patronymic'),
+    ('ix_keywords_title_kz_trgm', 'keywords', 'title_kz'),
+    ('ix_keywords_title_en_trgm', 'keywords', 'title_en'),
+    ('ix_keywords_title_ru_trgm', 'keywords', 'title_ru'),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table_name=table)
+    # The extension is left installed: other objects may depend on it
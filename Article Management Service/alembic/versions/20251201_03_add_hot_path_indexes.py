@@ -0,0 +1,68 @@
+"""Add composite indexes for hot article/volume queries
+
+Revision ID: 20251201_03
+Revises: 20251201_02
+Create Date: 2025-12-01
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251201_03'
+down_revision = '20251201_02'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, partial-index condition)
+INDEXES = [
+    # /articles/my: WHERE responsible_user_id = ? ORDER BY created_at DESC
+    ('ix_articles_responsible_user_created', 'articles',
+     ['responsible_user_id', sa.text('created_at DESC')], None),
+    # /articles/unassigned: WHERE status = ? ORDER BY created_at DESC, id DESC (keyset)
+    ('ix_articles_status_created_id', 'articles',
+     ['status', sa.text('created_at DESC'), sa.text('id DESC')], None),
+    # /articles/unassigned?status=all: ORDER BY created_at DESC, id DESC (keyset)
+    ('ix_articles_created_id', 'articles',
+     [sa.text('created_at DESC'), sa.text('id DESC')], None),
+    # Articles of an editor; most rows are unassigned, so index only the assigned ones
+    ('ix_articles_assigned_editor_id', 'articles',
+     ['assigned_editor_id'], sa.text('assigned_editor_id IS NOT NULL')),
+    # Versions of an article, latest first (version listing, next version number)
+    ('ix_article_versions_article_number', 'article_versions',
+     ['article_id', sa.text('version_number DESC')], None),
+    # Articles assigned to a reviewer, and the (article_id, user_id) duplicate check
+    ('ix_article_reviewers_user_article', 'article_reviewers',
+     ['user_id', 'article_id'], None),
+    ('ix_article_reviewers_article_user', 'article_reviewers',
+     ['article_id', 'user_id'], None),
+    # Reverse side of association primary keys, which lead with the other column
+    ('ix_volume_articles_article_id', 'volume_articles', ['article_id'], None),
+    ('ix_article_authors_author_id', 'article_authors', ['author_id'], None),
+    ('ix_article_keywords_keyword_id', 'article_keywords', ['keyword_id'], None),
+    # /volumes: uniqueness check on (year, number), ORDER BY year DESC, number DESC
+    ('ix_volumes_year_number', 'volumes', ['year', 'number'], None),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY does not lock out writes but cannot run
+    # inside a transaction. If a build fails it leaves an INVALID index:
+    # drop it by hand and rerun the migration.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=where,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
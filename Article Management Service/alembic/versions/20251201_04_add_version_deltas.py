@@ -0,0 +1,68 @@
+"""Allow article versions to be stored as keyframes plus field deltas
+
+Revision ID: 20251201_04
+Revises: 20251201_03
+Create Date: 2025-12-01
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251201_04'
+down_revision = '20251201_03'
+branch_labels = None
+depends_on = None
+
+# Snapshot columns that are NULL on delta rows (see app/versioning.py)
+SNAPSHOT_COLUMNS = [
+    'title_kz', 'title_en', 'title_ru',
+    'abstract_kz', 'abstract_en', 'abstract_ru',
+    'doi', 'article_type',
+    'manuscript_file_url', 'antiplagiarism_file_url', 'author_info_file_url', 'cover_letter_file_url',
+    'not_published_elsewhere', 'plagiarism_free', 'authors_agree', 'generative_ai_info',
+    'file_url',
+]
+REQUIRED_COLUMNS = ['title_kz', 'title_en', 'title_ru', 'article_type']
+
+
+def upgrade() -> None:
+    # Existing rows are full snapshots, i.e. keyframes
+    op.add_column('article_versions',
+                  sa.Column('is_keyframe', sa.Boolean(), nullable=False, server_default=sa.true()))
+    op.add_column('article_versions', sa.Column('delta', sa.JSON(), nullable=True))
+    for column in REQUIRED_COLUMNS:
+        op.alter_column('article_versions', column, nullable=True)
+
+
+def downgrade() -> None:
+    # Materialize delta rows back into full snapshots before dropping the delta columns
+    bind = op.get_bind()
+    versions = sa.table(
+        'article_versions',
+        sa.column('id'), sa.column('article_id'), sa.column('version_number'),
+        sa.column('is_keyframe'), sa.column('delta', sa.JSON()),
+        *(sa.column(name) for name in SNAPSHOT_COLUMNS),
+    )
+    article_ids = bind.execute(
+        sa.select(versions.c.article_id).where(versions.c.is_keyframe.is_(False)).distinct()
+    ).scalars().all()
+    for article_id in article_ids:
+        state = None
+        rows = bind.execute(
+            sa.select(versions)
+            .where(versions.c.article_id == article_id)
+            .order_by(versions.c.version_number, versions.c.id)
+        ).mappings().all()
+        for row in rows:
+            if row['is_keyframe']:
+                state = {name: row[name] for name in SNAPSHOT_COLUMNS}
+                continue
+            state = {**state, **(row['delta'] or {})}
+            bind.execute(versions.update().where(versions.c.id == row['id']).values(**state))
+
+    for column in REQUIRED_COLUMNS:
+        op.alter_column('article_versions', column, nullable=False)
+    op.drop_column('article_versions', 'delta')
+    op.drop_column('article_versions', 'is_keyframe')
@@ -1,10 +1,22 @@
+import base64
+import json
+import re
+from datetime import datetime
+from functools import reduce
+
 from fastapi import APIRouter, Depends, HTTPException, Header
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
 from sqlalchemy.orm import Session
 from typing import List
 from jose import jwt, JWTError
 import httpx
-from app import models, schemas, database, config
+from app import models, schemas, database, config, versioning, version_diff
+from app.loading import ARTICLE_SUMMARY, ARTICLE_VERSION_OUT, load_article, load_articles
 
 router = APIRouter(prefix="/articles", tags=["articles"])
 
@@ -23,6 +35,11 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with database.AsyncSessionLocal() as db:
+        yield db
+
+
 def get_current_user(authorization: str = Header(...)):
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid token")
@@ -53,55 +70,60 @@ def ensure_service_secret(x_service_secret: str | None):
         raise HTTPException(status_code=403, detail="Invalid service secret")
 
 
-def _create_article_version_snapshot(db: Session, article: models.Article, version_number: int, version_code: str) -> models.ArticleVersion:
+def _insert_links(db: Session, table, owner_column: str, owner_id: int, target_column: str, target_ids) -> None:
+    """
+    Вставка связей многострочным INSERT ... VALUES одним запросом
+    (вместо отдельного INSERT на каждого автора/ключевое слово).
+    """
+    rows = [{owner_column: owner_id, target_column: target_id} for target_id in dict.fromkeys(target_ids)]
+    if rows:
+        db.execute(table.insert().values(rows))
+
+
+def _ensure_ids_exist(db: Session, model, ids, detail: str) -> list[int]:
+    """Проверяет, что все id существуют, и возвращает их без дубликатов в исходном порядке."""
+    unique_ids = list(dict.fromkeys(ids))
+    found = db.query(model.id).filter(model.id.in_(unique_ids)).count() if unique_ids else 0
+    if found != len(unique_ids):
+        raise HTTPException(status_code=400, detail=detail)
+    return unique_ids
+
+
+def _create_article_version_snapshot(
+    db: Session,
+    article: models.Article,
+    version_number: int,
+    version_code: str,
+    author_ids: list[int] | None = None,
+    keyword_ids: list[int] | None = None,
+) -> models.ArticleVersion:
     """
     Создает полный снимок статьи в виде версии.
     Сохраняет все данные статьи, включая авторов и ключевые слова.
+    author_ids/keyword_ids передаются, если связи статьи только что переписаны
+    напрямую в таблицах и article.authors/article.keywords еще не обновлены.
     """
+    # Полный снимок данных статьи; в режиме VERSION_STORAGE=delta между
+    # ключевыми кадрами сохраняются только изменившиеся поля
+    state = versioning.snapshot(article)
     new_version = models.ArticleVersion(
         article_id=article.id,
         version_number=version_number,
         version_code=version_code,
-        # Полный снимок данных статьи
-        title_kz=article.title_kz,
-        title_en=article.title_en,
-        title_ru=article.title_ru,
-        abstract_kz=article.abstract_kz,
-        abstract_en=article.abstract_en,
-        abstract_ru=article.abstract_ru,
-        doi=article.doi,
-        article_type=article.article_type,
-        manuscript_file_url=article.manuscript_file_url,
-        antiplagiarism_file_url=article.antiplagiarism_file_url,
-        author_info_file_url=article.author_info_file_url,
-        cover_letter_file_url=article.cover_letter_file_url,
-        not_published_elsewhere=article.not_published_elsewhere,
-        plagiarism_free=article.plagiarism_free,
-        authors_agree=article.authors_agree,
-        generative_ai_info=article.generative_ai_info,
-        # Legacy поле для обратной совместимости
-        file_url=article.manuscript_file_url,
+        **versioning.storage_columns(db, article.id, version_number, state),
     )
     db.add(new_version)
     db.flush()
+    versioning.fill(new_version, state)
     
-    # Копируем авторов
-    for author in article.authors:
-        db.execute(
-            models.article_version_authors.insert().values(
-                version_id=new_version.id,
-                author_id=author.id
-            )
-        )
+    if author_ids is None:
+        author_ids = [author.id for author in article.authors]
+    if keyword_ids is None:
+        keyword_ids = [keyword.id for keyword in article.keywords]
     
-    # Копируем ключевые слова
-    for keyword in article.keywords:
-        db.execute(
-            models.article_version_keywords.insert().values(
-                version_id=new_version.id,
-                keyword_id=keyword.id
-            )
-        )
+    # Копируем авторов и ключевые слова (по одному INSERT на таблицу)
+    _insert_links(db, models.article_version_authors, "version_id", new_version.id, "author_id", author_ids)
+    _insert_links(db, models.article_version_keywords, "version_id", new_version.id, "keyword_id", keyword_ids)
     
     return new_version
 
@@ -123,18 +145,80 @@ def list_my_articles(
     Список статей текущего пользователя-автора.
     Фильтр по responsible_user_id == current_user["user_id"].
     """
-    from sqlalchemy.orm import joinedload
-    articles = (
-        db.query(models.Article)
-        .options(
-            joinedload(models.Article.authors),
-            joinedload(models.Article.keywords)
-        )
+    article_ids = [
+        article_id
+        for (article_id,) in db.query(models.Article.id)
         .filter(models.Article.responsible_user_id == current_user["user_id"])
         .order_by(models.Article.created_at.desc())
-        .all()
+    ]
+    return load_articles(db, article_ids)
+
+
+# -слово или -"фраза" в начале слова; фразы в кавычках пропускаются целиком
+_SEARCH_TOKENS = re.compile(r'(?<!\S)-("[^"]*"?|[^\s"]+)|"[^"]*"?')
+
+
+def _split_search_exclusions(search: str) -> tuple[str, list[str]]:
+    """Запрос websearch без исключений и список исключенных слов и фраз."""
+    excluded = []
+
+    def take(match):
+        if match.group(1) is None:
+            return match.group(0)
+        excluded.append(match.group(1).strip('"'))
+        return " "
+
+    return _SEARCH_TOKENS.sub(take, search), excluded
+
+
+def _search_tsquery(function, search: str):
+    """tsquery строки в конфигурации каждого из языков, объединенные через OR."""
+    return reduce(
+        lambda left, right: left.op("||")(right),
+        [function(literal_column(f"'{config}'::regconfig"), search) for config in models.SEARCH_CONFIGS],
     )
-    return articles
+
+
+def _encode_cursor(row) -> str:
+    """Курсор keyset-пагинации: значения ключей сортировки последней строки страницы."""
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in row]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError
+        # Порядок ключей: [ts_rank,] created_at, id
+        values[-2] = datetime.fromisoformat(values[-2])
+        if not isinstance(values[-1], int) or not all(isinstance(value, (int, float)) for value in values[:-2]):
+            raise ValueError
+        return values
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) запроса; параметры проходят обычную обработку типов."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _estimate_count(db: Session, query) -> int:
+    """Оценка числа строк запроса по плану PostgreSQL (EXPLAIN), без его выполнения."""
+    plan = db.execute(_Explain(query.statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
 
 
 @router.get("/unassigned")
@@ -148,9 +232,12 @@ def list_unassigned_articles(
     article_type: str = None,
     keywords: str = None,
     search: str = None,
+    rank: bool = False,
     # Пагинация
+    cursor: str = None,
     page: int = 1,
     page_size: int = 10,
+    exact_count: bool = False,
 ):
     """
     Список статей для редактора с фильтрацией и пагинацией.
@@ -161,28 +248,25 @@ def list_unassigned_articles(
     - year: Год создания статьи
     - article_type: Тип статьи (original, review)
     - keywords: Ключевые слова через запятую (поиск по любому из них)
-    - search: Общий поиск по заголовку и аннотации (на всех языках)
+    - search: Полнотекстовый поиск по заголовку и аннотации (на всех языках),
+      синтаксис websearch: "точная фраза", OR, -исключение
+    - rank: Сортировать результаты поиска по релевантности (ts_rank)
     
     Параметры пагинации:
-    - page: Номер страницы (начиная с 1)
+    - cursor: Непрозрачный курсор next_cursor из предыдущего ответа
+    - page: Номер страницы (начиная с 1); устаревший режим, используйте cursor
     - page_size: Количество элементов на странице (по умолчанию 10)
+    - exact_count: Посчитать total_count точно; по умолчанию это оценка планировщика
     
     Возвращает статьи со статусом 'submitted' по умолчанию.
     Доступно только для пользователей с ролью 'editor'.
     """
     ensure_editor(current_user)
     
-    from sqlalchemy.orm import joinedload
-    from sqlalchemy import extract, or_, and_
+    from sqlalchemy import REAL, cast, or_, tuple_
     
-    # Базовый запрос
-    query = (
-        db.query(models.Article)
-        .options(
-            joinedload(models.Article.authors),
-            joinedload(models.Article.keywords)
-        )
-    )
+    # Базовый запрос (авторы и ключевые слова догружаются для страницы отдельно)
+    query = db.query(models.Article)
     
     # Фильтр по статусу (по умолчанию только submitted)
     # Особый кейс: если status == "all", не фильтруем по статусу.
@@ -199,19 +283,26 @@ def list_unassigned_articles(
         # По умолчанию показываем только submitted статьи
         query = query.filter(models.Article.status == models.ArticleStatus.submitted)
     
-    # Фильтр по автору
+    # Фильтр по автору. EXISTS вместо JOIN: статья не размножается по числу
+    # совпавших авторов, а ILIKE обслуживается trigram-индексами (20251201_02)
     if author_name:
-        query = query.join(models.Article.authors).filter(
-            or_(
+        query = query.filter(
+            models.Article.authors.any(or_(
                 models.Author.first_name.ilike(f"%{author_name}%"),
                 models.Author.last_name.ilike(f"%{author_name}%"),
                 models.Author.patronymic.ilike(f"%{author_name}%")
-            )
+            ))
         )
     
-    # Фильтр по году
+    # Фильтр по году: диапазон по created_at, а не extract(year), чтобы
+    # работал индекс по created_at
     if year:
-        query = query.filter(extract('year', models.Article.created_at) == year)
+        if not 1 <= year <= 9998:
+            raise HTTPException(status_code=400, detail=f"Invalid year: {year}")
+        query = query.filter(
+            models.Article.created_at >= datetime(year, 1, 1),
+            models.Article.created_at < datetime(year + 1, 1, 1),
+        )
     
     # Фильтр по типу статьи
     if article_type:
@@ -234,50 +325,82 @@ def list_unassigned_articles(
                         models.Keyword.title_ru.ilike(f"%{keyword_text}%")
                     )
                 )
-            query = query.join(models.Article.keywords).filter(or_(*keyword_filters))
+            query = query.filter(models.Article.keywords.any(or_(*keyword_filters)))
     
-    # Общий поиск по заголовку и аннотации
-    if search:
-        search_filter = or_(
-            models.Article.title_kz.ilike(f"%{search}%"),
-            models.Article.title_en.ilike(f"%{search}%"),
-            models.Article.title_ru.ilike(f"%{search}%"),
-            models.Article.abstract_kz.ilike(f"%{search}%"),
-            models.Article.abstract_en.ilike(f"%{search}%"),
-            models.Article.abstract_ru.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
+    # Общий поиск по заголовку и аннотации: полнотекстовый, по GIN-индексу
+    # search_vector. Запрос разбирается websearch_to_tsquery ("фразы в
+    # кавычках", OR) в конфигурации каждого из языков. Исключения
+    # (-слово) применяются отдельно: внутри OR по конфигурациям статья
+    # со словом в английской форме прошла бы ветку 'simple', где его нет.
+    search_query = None
+    if search and search.strip():
+        search, excluded = _split_search_exclusions(search)
+        if search.strip():
+            search_query = _search_tsquery(func.websearch_to_tsquery, search)
+            query = query.filter(models.Article.search_vector.op("@@")(search_query))
+        for phrase in excluded:
+            query = query.filter(~models.Article.search_vector.op("@@")(_search_tsquery(func.phraseto_tsquery, phrase)))
     
     # Убран фильтр назначенности редактору по полю assigned_editor_id.
     # Эндпоинт больше не ограничивает результаты по назначению редактора.
 
-    # Подсчет общего количества записей
-    total_count = query.distinct().count()
-    
-    # Применяем сортировку и пагинацию
-    query = query.distinct().order_by(models.Article.created_at.desc())
-    
     # Валидация параметров пагинации
     if page < 1:
         raise HTTPException(status_code=400, detail="Page must be >= 1")
     if page_size < 1 or page_size > 100:
         raise HTTPException(status_code=400, detail="Page size must be between 1 and 100")
-    
-    offset = (page - 1) * page_size
-    articles = query.offset(offset).limit(page_size).all()
-    
+
+    # Сначала выбираем только id страницы (по индексу, без JOIN авторов и
+    # ключевых слов), затем догружаем статьи. Порядок — (created_at, id)
+    # по убыванию, при rank — сначала по релевантности.
+    sort_keys = [models.Article.created_at, models.Article.id]
+    if search_query is not None and rank:
+        # Сначала наиболее релевантные (совпадения в заголовке весят больше)
+        sort_keys.insert(0, func.ts_rank(models.Article.search_vector, search_query))
+    id_query = query.with_entities(*sort_keys)
+
+    # Общее количество: точное — только по запросу (count(*) проходит все
+    # подходящие строки), иначе оценка планировщика
+    if exact_count:
+        total_count = id_query.order_by(None).count()
+    else:
+        total_count = _estimate_count(db, id_query)
+
+    page_query = id_query.order_by(*[key.desc() for key in sort_keys])
+    if cursor:
+        # Keyset: строки строго после последней строки предыдущей страницы.
+        # Стоимость не зависит от глубины страницы.
+        values = _decode_cursor(cursor, len(sort_keys))
+        if len(values) == 3:
+            # ts_rank возвращает real: граница тоже сравнивается как real, иначе
+            # округленный драйвером ранг не равен рангу своей же строки
+            values[0] = cast(values[0], REAL)
+        page_query = page_query.filter(tuple_(*sort_keys) < tuple_(*values))
+    elif page > 1:
+        # Устаревший режим по номеру страницы: OFFSET, глубокие страницы медленнее
+        page_query = page_query.offset((page - 1) * page_size)
+    rows = page_query.limit(page_size + 1).all()
+
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = _encode_cursor(rows[-1]) if has_next else None
+
+    articles = load_articles(db, [row[-1] for row in rows], ARTICLE_SUMMARY)
+
     # Рассчитываем информацию о пагинации
     total_pages = (total_count + page_size - 1) // page_size if total_count > 0 else 0
-    
+
     return {
         "items": articles,
         "pagination": {
             "total_count": total_count,
+            "total_count_exact": exact_count,
             "page": page,
             "page_size": page_size,
             "total_pages": total_pages,
-            "has_next": page < total_pages,
-            "has_prev": page > 1
+            "has_next": has_next,
+            "has_prev": bool(cursor) or page > 1,
+            "next_cursor": next_cursor,
         }
     }
 
@@ -295,18 +418,7 @@ def get_article_detail_for_editor(
     """
     ensure_editor(current_user)
     
-    from sqlalchemy.orm import joinedload
-    article = (
-        db.query(models.Article)
-        .options(
-            joinedload(models.Article.authors),
-            joinedload(models.Article.keywords),
-            joinedload(models.Article.versions).joinedload(models.ArticleVersion.authors),
-            joinedload(models.Article.versions).joinedload(models.ArticleVersion.keywords)
-        )
-        .filter(models.Article.id == article_id)
-        .first()
-    )
+    article = load_article(db, article_id)
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
@@ -330,8 +442,7 @@ def get_article_version_detail_for_editor(
     version = (
         db.query(models.ArticleVersion)
         .options(
-            joinedload(models.ArticleVersion.authors),
-            joinedload(models.ArticleVersion.keywords),
+            *ARTICLE_VERSION_OUT,
             joinedload(models.ArticleVersion.article),
         )
         .filter(
@@ -342,9 +453,34 @@ def get_article_version_detail_for_editor(
     )
     if not version:
         raise HTTPException(status_code=404, detail="Article version not found")
+    versioning.materialize(db, [version])
     return version
 
 
+@router.get(
+    "/editor/{article_id}/versions/{version_a}/diff/{version_b}",
+    response_model=schemas.ArticleVersionDiffOut,
+)
+def diff_article_versions(
+    article_id: int,
+    version_a: int,
+    version_b: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Сравнение двух версий статьи для редактора (version_a -> version_b).
+    version_a и version_b — номера версий (3 и 5 для TAU-V3 и TAU-V5), а не id.
+    Возвращает только изменившиеся поля (для заголовков и аннотаций — с пословным diff),
+    а также добавленных/удаленных авторов и ключевые слова.
+    """
+    ensure_editor(current_user)
+    diff = version_diff.diff_versions(db, article_id, version_a, version_b)
+    if diff is None:
+        raise HTTPException(status_code=404, detail="Article version not found")
+    return diff
+
+
 @router.get("/my/{article_id}", response_model=schemas.ArticleOut)
 def get_article_detail(
     article_id: int,
@@ -355,17 +491,7 @@ def get_article_detail(
     Детальная страница статьи для автора.
     Доступна только ответственному пользователю (responsible_user_id).
     """
-    from sqlalchemy.orm import joinedload
-    article = (
-        db.query(models.Article)
-        .options(
-            joinedload(models.Article.authors),
-            joinedload(models.Article.keywords),
-            joinedload(models.Article.versions)
-        )
-        .filter(models.Article.id == article_id)
-        .first()
-    )
+    article = load_article(db, article_id)
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     if article.responsible_user_id != current_user["user_id"]:
@@ -389,8 +515,7 @@ def get_article_version_detail(
     version = (
         db.query(models.ArticleVersion)
         .options(
-            joinedload(models.ArticleVersion.authors),
-            joinedload(models.ArticleVersion.keywords),
+            *ARTICLE_VERSION_OUT,
             joinedload(models.ArticleVersion.article),
         )
         .filter(
@@ -412,13 +537,14 @@ def get_article_version_detail(
     if article.responsible_user_id != current_user["user_id"]:
         raise HTTPException(status_code=403, detail="You are not the responsible user for this article")
 
+    versioning.materialize(db, [version])
     return version
 
 
 @router.get("/my/{article_id}/file")
 async def get_article_manuscript(
     article_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user),
 ):
     """
@@ -426,11 +552,7 @@ async def get_article_manuscript(
     Доступна только ответственному пользователю (responsible_user_id).
     Делает запрос к микросервису FileProcessing для получения ссылки на скачивание.
     """
-    article = (
-        db.query(models.Article)
-        .filter(models.Article.id == article_id)
-        .first()
-    )
+    article = await db.get(models.Article, article_id)
     
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
@@ -477,22 +599,34 @@ async def get_article_manuscript(
         raise HTTPException(status_code=502, detail=f"Failed to connect to file service: {str(e)}")
 
 
+# Заголовки ответа FileStorage, которые отдаются клиенту как есть
+MANUSCRIPT_PASSTHROUGH_HEADERS = (
+    "content-length",
+    "content-range",
+    "content-encoding",
+    "accept-ranges",
+    "etag",
+    "last-modified",
+    "content-disposition",
+)
+
+
 @router.get("/my/{article_id}/file/download")
 async def download_article_manuscript(
     article_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user),
+    range_header: str | None = Header(default=None, alias="Range"),
+    if_range: str | None = Header(default=None, alias="If-Range"),
 ):
     """
     Прямое скачивание файла рукописи статьи.
     Доступна только ответственному пользователю (responsible_user_id).
-    Проксирует файл из микросервиса FileProcessing.
+    Потоково проксирует файл из микросервиса FileProcessing без буферизации в памяти;
+    Range/If-Range передаются дальше, так что просмотрщики PDF могут запрашивать
+    отдельные диапазоны байт (ответ 206).
     """
-    article = (
-        db.query(models.Article)
-        .filter(models.Article.id == article_id)
-        .first()
-    )
+    article = await db.get(models.Article, article_id)
     
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
@@ -509,46 +643,63 @@ async def download_article_manuscript(
     except (IndexError, AttributeError):
         raise HTTPException(status_code=400, detail="Invalid manuscript file URL")
     
-    # Запрос к микросервису FileProcessing для скачивания файла
+    # Соединение с БД больше не нужно: не держим его из пула, пока идет скачивание
+    await db.close()
+    
+    headers = {}
+    if range_header:
+        headers["Range"] = range_header
+    if if_range:
+        headers["If-Range"] = if_range
+    
+    # Запрос к микросервису FileProcessing: тело читается по частям по мере отправки клиенту
+    # (то же, что client.stream(), но закрытие ответа переносится в фоновую задачу StreamingResponse)
+    client = httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=10.0))
     try:
-        async with httpx.AsyncClient() as client:
-            # Сначала получаем метаданные файла
-            metadata_response = await client.get(
-                f"{config.FILE_SERVICE_URL}/files/{file_id}",
-                timeout=10.0
-            )
-            
-            if metadata_response.status_code == 404:
-                raise HTTPException(status_code=404, detail="File not found in storage")
-            elif metadata_response.status_code != 200:
-                raise HTTPException(status_code=502, detail="Failed to retrieve file metadata")
-            
-            file_data = metadata_response.json()
-            filename = file_data.get("filename", "manuscript.pdf")
-            content_type = file_data.get("content_type", "application/octet-stream")
-            
-            # Теперь скачиваем сам файл
-            download_response = await client.get(
-                f"{config.FILE_SERVICE_URL}/files/{file_id}/download",
-                timeout=30.0
-            )
-            
-            if download_response.status_code != 200:
-                raise HTTPException(status_code=502, detail="Failed to download file from storage service")
-            
-            # Возвращаем файл с правильными заголовками
-            return StreamingResponse(
-                iter([download_response.content]),
-                media_type=content_type,
-                headers={
-                    "Content-Disposition": f'attachment; filename="{filename}"',
-                    "Content-Length": str(len(download_response.content))
-                }
-            )
+        download_response = await client.send(
+            client.build_request("GET", f"{config.FILE_SERVICE_URL}/files/{file_id}/download", headers=headers),
+            stream=True,
+        )
     except httpx.TimeoutException:
+        await client.aclose()
         raise HTTPException(status_code=504, detail="File service timeout")
     except httpx.RequestError as e:
+        await client.aclose()
         raise HTTPException(status_code=502, detail=f"Failed to connect to file service: {str(e)}")
+    
+    async def close_download():
+        await download_response.aclose()
+        await client.aclose()
+    
+    if download_response.status_code not in (200, 206, 416):
+        await close_download()
+        if download_response.status_code == 404:
+            raise HTTPException(status_code=404, detail="File not found in storage")
+        raise HTTPException(status_code=502, detail="Failed to download file from storage service")
+    
+    response_headers = {
+        name: download_response.headers[name]
+        for name in MANUSCRIPT_PASSTHROUGH_HEADERS
+        if name in download_response.headers
+    }
+    response_headers.setdefault("content-disposition", 'attachment; filename="manuscript.pdf"')
+    
+    # aiter_raw: байты отдаются без распаковки, поэтому Content-Length/Content-Encoding остаются верными
+    async def body():
+        try:
+            async for chunk in download_response.aiter_raw():
+                yield chunk
+        finally:
+            # Клиент мог оборвать скачивание, тогда фоновая задача не выполняется
+            await close_download()
+    
+    return StreamingResponse(
+        body(),
+        status_code=download_response.status_code,
+        media_type=download_response.headers.get("content-type", "application/octet-stream"),
+        headers=response_headers,
+        background=BackgroundTask(close_download),
+    )
 
 
 @router.get("/keywords/{keyword_id}", response_model=schemas.KeywordOut)
@@ -632,18 +783,12 @@ def create_article(article: schemas.ArticleCreateWithIds, db: Session = Depends(
     db.flush()
 
     if article.author_ids:
-        authors = db.query(models.Author).filter(models.Author.id.in_(article.author_ids)).all()
-        if len(authors) != len(set(article.author_ids)):
-            raise HTTPException(status_code=400, detail="One or more authors not found")
-        for author in authors:
-            db.execute(models.article_authors.insert().values(article_id=new_article.id, author_id=author.id))
+        author_ids = _ensure_ids_exist(db, models.Author, article.author_ids, "One or more authors not found")
+        _insert_links(db, models.article_authors, "article_id", new_article.id, "author_id", author_ids)
 
     if article.keyword_ids:
-        keywords = db.query(models.Keyword).filter(models.Keyword.id.in_(article.keyword_ids)).all()
-        if len(keywords) != len(set(article.keyword_ids)):
-            raise HTTPException(status_code=400, detail="One or more keywords not found")
-        for keyword in keywords:
-            db.execute(models.article_keywords.insert().values(article_id=new_article.id, keyword_id=keyword.id))
+        keyword_ids = _ensure_ids_exist(db, models.Keyword, article.keyword_ids, "One or more keywords not found")
+        _insert_links(db, models.article_keywords, "article_id", new_article.id, "keyword_id", keyword_ids)
 
     db.commit()
     db.refresh(new_article)
@@ -703,18 +848,12 @@ def create_article_by_ids(
     db.flush()
 
     if article.author_ids:
-        authors = db.query(models.Author).filter(models.Author.id.in_(article.author_ids)).all()
-        if len(authors) != len(set(article.author_ids)):
-            raise HTTPException(status_code=400, detail="One or more authors not found")
-        for author in authors:
-            db.execute(models.article_authors.insert().values(article_id=new_article.id, author_id=author.id))
+        author_ids = _ensure_ids_exist(db, models.Author, article.author_ids, "One or more authors not found")
+        _insert_links(db, models.article_authors, "article_id", new_article.id, "author_id", author_ids)
 
     if article.keyword_ids:
-        keywords = db.query(models.Keyword).filter(models.Keyword.id.in_(article.keyword_ids)).all()
-        if len(keywords) != len(set(article.keyword_ids)):
-            raise HTTPException(status_code=400, detail="One or more keywords not found")
-        for keyword in keywords:
-            db.execute(models.article_keywords.insert().values(article_id=new_article.id, keyword_id=keyword.id))
+        keyword_ids = _ensure_ids_exist(db, models.Keyword, article.keyword_ids, "One or more keywords not found")
+        _insert_links(db, models.article_keywords, "article_id", new_article.id, "keyword_id", keyword_ids)
 
     db.commit()
     db.refresh(new_article)
@@ -733,19 +872,8 @@ def update_article(
     Может обновить только responsible user (ответственный автор).
     При каждом обновлении создается новая версия с кодом TAU-V{номер}.
     """
-    from sqlalchemy.orm import joinedload
-    
     # Получаем статью
-    existing_article = (
-        db.query(models.Article)
-        .options(
-            joinedload(models.Article.authors),
-            joinedload(models.Article.keywords),
-            joinedload(models.Article.versions)
-        )
-        .filter(models.Article.id == article_id)
-        .first()
-    )
+    existing_article = load_article(db, article_id, ARTICLE_SUMMARY)
     
     if not existing_article:
         raise HTTPException(status_code=404, detail="Article not found")
@@ -771,38 +899,28 @@ def update_article(
         existing_article.cover_letter_file_url = _file_id_to_url(update_data.pop("cover_letter_file_id"))
     
     # Обновляем авторов
+    author_ids = None
     if "author_ids" in update_data:
-        author_ids = update_data.pop("author_ids")
-        # Удаляем старые связи
+        author_ids = _ensure_ids_exist(
+            db, models.Author, update_data.pop("author_ids") or [], "One or more authors not found"
+        )
+        # Удаляем старые связи и добавляем новые одним INSERT
         db.execute(
             models.article_authors.delete().where(models.article_authors.c.article_id == article_id)
         )
-        # Добавляем новые связи
-        if author_ids:
-            authors = db.query(models.Author).filter(models.Author.id.in_(author_ids)).all()
-            if len(authors) != len(set(author_ids)):
-                raise HTTPException(status_code=400, detail="One or more authors not found")
-            for author in authors:
-                db.execute(
-                    models.article_authors.insert().values(article_id=article_id, author_id=author.id)
-                )
+        _insert_links(db, models.article_authors, "article_id", article_id, "author_id", author_ids)
     
     # Обновляем ключевые слова
+    keyword_ids = None
     if "keyword_ids" in update_data:
-        keyword_ids = update_data.pop("keyword_ids")
-        # Удаляем старые связи
+        keyword_ids = _ensure_ids_exist(
+            db, models.Keyword, update_data.pop("keyword_ids") or [], "One or more keywords not found"
+        )
+        # Удаляем старые связи и добавляем новые одним INSERT
         db.execute(
             models.article_keywords.delete().where(models.article_keywords.c.article_id == article_id)
         )
-        # Добавляем новые связи
-        if keyword_ids:
-            keywords = db.query(models.Keyword).filter(models.Keyword.id.in_(keyword_ids)).all()
-            if len(keywords) != len(set(keyword_ids)):
-                raise HTTPException(status_code=400, detail="One or more keywords not found")
-            for keyword in keywords:
-                db.execute(
-                    models.article_keywords.insert().values(article_id=article_id, keyword_id=keyword.id)
-                )
+        _insert_links(db, models.article_keywords, "article_id", article_id, "keyword_id", keyword_ids)
     
     # Обновляем остальные поля статьи
     for field, value in update_data.items():
@@ -823,21 +941,24 @@ def update_article(
     version_number = max_version.version_number + 1 if max_version else 1
     version_code = f"TAU-V{version_number}"
     
-    # Создаем полный снимок статьи
+    # Создаем полный снимок статьи; связи берем из запроса, если они менялись,
+    # потому что existing_article.authors/keywords загружены до перезаписи таблиц
     new_version = _create_article_version_snapshot(
         db=db,
         article=existing_article,
         version_number=version_number,
-        version_code=version_code
+        version_code=version_code,
+        author_ids=author_ids,
+        keyword_ids=keyword_ids,
     )
     
     # Обновляем ссылку на текущую версию
     existing_article.current_version_id = new_version.id
     
     db.commit()
-    db.refresh(existing_article)
     
-    return existing_article
+    # Перечитываем статью со всеми коллекциями ArticleOut (после commit они устарели)
+    return load_article(db, article_id)
 
 
 @router.post("/{article_id}/versions", response_model=schemas.ArticleVersionOut)
@@ -847,17 +968,7 @@ def add_version(article_id: int, version: schemas.ArticleVersionBase, db: Sessio
     Доступна только ответственному пользователю (responsible_user_id).
     Создает полный снимок статьи на текущий момент.
     """
-    from sqlalchemy.orm import joinedload
-    
-    article = (
-        db.query(models.Article)
-        .options(
-            joinedload(models.Article.authors),
-            joinedload(models.Article.keywords)
-        )
-        .filter(models.Article.id == article_id)
-        .first()
-    )
+    article = load_article(db, article_id, ARTICLE_SUMMARY)
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
 
@@ -880,6 +991,7 @@ def add_version(article_id: int, version: schemas.ArticleVersionBase, db: Sessio
     article.current_version_id = new_version.id
     db.commit()
     db.refresh(new_version)
+    versioning.materialize(db, [new_version])
     return new_version
 
 
@@ -928,7 +1040,7 @@ def mark_review_submitted_internal(
 async def assign_reviewers(
     article_id: int, 
     request: schemas.AssignReviewerRequest,
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_async_db), 
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -938,37 +1050,37 @@ async def assign_reviewers(
     ensure_editor(current_user)
     
     # Проверяем существование статьи
-    article = db.query(models.Article).filter(models.Article.id == article_id).first()
+    article = await db.get(models.Article, article_id)
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
-    # Сохраняем связь article-reviewers в Article Management Service
-    for reviewer_id in request.reviewer_ids:
-        # Проверяем, не назначен ли уже этот рецензент
-        existing = db.execute(
-            models.article_reviewers.select().where(
+    # Сохраняем связь article-reviewers в Article Management Service:
+    # уже назначенных рецензентов выбираем одним запросом, новых вставляем одной пачкой
+    existing = set(
+        (await db.execute(
+            select(models.article_reviewers.c.user_id).where(
                 models.article_reviewers.c.article_id == article_id,
-                models.article_reviewers.c.user_id == reviewer_id
-            )
-        ).first()
-        
-        if not existing:
-            db.execute(
-                models.article_reviewers.insert().values(
-                    article_id=article.id, 
-                    user_id=reviewer_id
-                )
+                models.article_reviewers.c.user_id.in_(request.reviewer_ids)
             )
+        )).scalars()
+    )
+    new_reviewer_ids = [
+        reviewer_id for reviewer_id in dict.fromkeys(request.reviewer_ids) if reviewer_id not in existing
+    ]
+    if new_reviewer_ids:
+        await db.execute(
+            models.article_reviewers.insert(),
+            [{"article_id": article.id, "user_id": reviewer_id} for reviewer_id in new_reviewer_ids]
+        )
     
-    db.commit()
+    await db.commit()
     
     # Переводим статью в статус проверки у рецензента
     try:
         article.status = models.ArticleStatus.reviewer_check
-        db.commit()
-        db.refresh(article)
+        await db.commit()
     except Exception:
-        db.rollback()
+        await db.rollback()
     
     # Отправляем запрос в Review Service для создания Review записей
     review_service_url = config.REVIEW_SERVICE_URL if hasattr(config, 'REVIEW_SERVICE_URL') else "http://reviews:8000"
@@ -11,3 +11,25 @@ EDITORIAL_SERVICE_URL = os.getenv("EDITORIAL_SERVICE_URL", "http://editorial:900
 SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
 ALGORITHM = "HS256"
 SHARED_SERVICE_SECRET = os.getenv("SHARED_SERVICE_SECRET", "service-shared-secret")
+
+# Пул соединений с БД (общий для sync- и async-движков, у каждого свой пул)
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL",
+    DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1),
+)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Кэш подготовленных выражений asyncpg на соединение (0 — выключить, нужно за pgbouncer)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+
+# Хранение версий статей: full — полный снимок в каждой версии,
+# delta — ключевой кадр раз в VERSION_KEYFRAME_INTERVAL версий и дельты полей между ними
+VERSION_STORAGE = os.getenv("VERSION_STORAGE", "full").lower()
+VERSION_KEYFRAME_INTERVAL = int(os.getenv("VERSION_KEYFRAME_INTERVAL", "10"))
+# Кэш восстановленных снимков версий-дельт (число версий, 0 — выключить)
+VERSION_CACHE_SIZE = int(os.getenv("VERSION_CACHE_SIZE", "2048"))
+# Кэш готовых diff между парами версий (число пар, 0 — выключить)
+VERSION_DIFF_CACHE_SIZE = int(os.getenv("VERSION_DIFF_CACHE_SIZE", "512"))
@@ -1,7 +1,42 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from app.config import DATABASE_URL
+from app.config import (
+    DATABASE_URL,
+    ASYNC_DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_CACHE_SIZE,
+)
 
-engine = create_engine(DATABASE_URL)
+_pool_options = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+# Синхронный движок: обычные (def) обработчики, выполняются в пуле потоков
+engine = create_engine(DATABASE_URL, **_pool_options)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Асинхронный движок (asyncpg): для async def обработчиков, чтобы запросы
+# к БД не блокировали цикл событий
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=(
+        {"statement_cache_size": DB_STATEMENT_CACHE_SIZE}
+        if ASYNC_DATABASE_URL.startswith("postgresql+asyncpg")
+        else {}
+    ),
+    **_pool_options,
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
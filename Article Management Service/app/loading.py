@@ -0,0 +1,52 @@
+"""
+Стратегии загрузки статей.
+
+Коллекции (авторы, ключевые слова, версии и их авторы/ключевые слова) грузятся
+через selectinload: один дополнительный запрос `WHERE id IN (...)` на каждую
+коллекцию вместо joinedload, при котором JOIN нескольких коллекций сразу даёт
+декартово произведение строк (версии × авторы × ключевые слова), которое затем
+схлопывается в Python.
+
+Списки сначала выбирают id страницы, затем гидратируют статьи по этим id
+(load_articles), чтобы LIMIT/OFFSET и сортировка работали по одной строке на
+статью.
+"""
+from sqlalchemy.orm import Session, selectinload
+
+from app import models, versioning
+
+# Статья с авторами и ключевыми словами (списки без версий)
+ARTICLE_SUMMARY = (
+    selectinload(models.Article.authors),
+    selectinload(models.Article.keywords),
+)
+
+# Версия статьи, как в schemas.ArticleVersionOut
+ARTICLE_VERSION_OUT = (
+    selectinload(models.ArticleVersion.authors),
+    selectinload(models.ArticleVersion.keywords),
+)
+
+# Всё, что сериализует schemas.ArticleOut, включая версии с их авторами и ключевыми словами
+ARTICLE_OUT = ARTICLE_SUMMARY + (
+    selectinload(models.Article.versions).options(*ARTICLE_VERSION_OUT),
+)
+
+
+def load_articles(db: Session, ids: list[int], options=ARTICLE_OUT) -> list[models.Article]:
+    """Гидратация статей по списку id с сохранением порядка id."""
+    if not ids:
+        return []
+    by_id = {
+        article.id: article
+        for article in db.query(models.Article).options(*options).filter(models.Article.id.in_(ids))
+    }
+    versioning.materialize_articles(db, by_id.values())
+    return [by_id[article_id] for article_id in ids if article_id in by_id]
+
+
+def load_article(db: Session, article_id: int, options=ARTICLE_OUT) -> models.Article | None:
+    article = db.query(models.Article).options(*options).filter(models.Article.id == article_id).first()
+    if article:
+        versioning.materialize_articles(db, [article])
+    return article
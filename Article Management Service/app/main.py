@@ -1,13 +1,15 @@
 from fastapi import FastAPI
+from app.deadline import DeadlineMiddleware
 from app.articles_router import router as articles_router
 from app.volumes_router import router as volumes_router
-from app.database import Base, engine
+from app.database import Base, engine, async_engine
 from app import models  # register models for metadata
 from alembic.config import Config
 from alembic import command
 import os
 
 app = FastAPI(title="Article Management Service")
+app.add_middleware(DeadlineMiddleware)
 
 
 def run_migrations():
@@ -25,5 +27,15 @@ def run_migrations():
 # Run migrations on startup
 run_migrations()
 
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
 app.include_router(articles_router)
 app.include_router(volumes_router)
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
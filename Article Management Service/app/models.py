@@ -1,15 +1,29 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Table, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Table, Boolean, Computed, Index, JSON, true, DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
 
+# Trigram-индексы (миграция 20251201_02) требуют расширения pg_trgm
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+def _trigram_index(name: str, column: str) -> Index:
+    """GIN-индекс pg_trgm: ILIKE '%x%' по колонке без полного просмотра таблицы."""
+    return Index(name, column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+
 # Association tables
 article_authors = Table(
     "article_authors",
     Base.metadata,
     Column("article_id", Integer, ForeignKey("articles.id"), primary_key=True),
     Column("author_id", Integer, ForeignKey("authors.id"), primary_key=True),
+    Index("ix_article_authors_author_id", "author_id"),
 )
 
 article_reviewers = Table(
@@ -17,6 +31,8 @@ article_reviewers = Table(
     Base.metadata,
     Column("article_id", Integer, ForeignKey("articles.id"), primary_key=True),
     Column("user_id", Integer, nullable=False),
+    Index("ix_article_reviewers_user_article", "user_id", "article_id"),
+    Index("ix_article_reviewers_article_user", "article_id", "user_id"),
 )
 
 article_keywords = Table(
@@ -24,6 +40,7 @@ article_keywords = Table(
     Base.metadata,
     Column("article_id", Integer, ForeignKey("articles.id"), primary_key=True),
     Column("keyword_id", Integer, ForeignKey("keywords.id"), primary_key=True),
+    Index("ix_article_keywords_keyword_id", "keyword_id"),
 )
 
 # Association tables for article versions
@@ -47,6 +64,7 @@ volume_articles = Table(
     Base.metadata,
     Column("volume_id", Integer, ForeignKey("volumes.id"), primary_key=True),
     Column("article_id", Integer, ForeignKey("articles.id"), primary_key=True),
+    Index("ix_volume_articles_article_id", "article_id"),
 )
 
 
@@ -90,6 +108,12 @@ class Author(Base):
 
     articles = relationship("Article", secondary=article_authors, back_populates="authors")
 
+    __table_args__ = (
+        _trigram_index("ix_authors_first_name_trgm", "first_name"),
+        _trigram_index("ix_authors_last_name_trgm", "last_name"),
+        _trigram_index("ix_authors_patronymic_trgm", "patronymic"),
+    )
+
 
 class Keyword(Base):
     __tablename__ = "keywords"
@@ -101,6 +125,25 @@ class Keyword(Base):
 
     articles = relationship("Article", secondary=article_keywords, back_populates="keywords")
 
+    __table_args__ = (
+        _trigram_index("ix_keywords_title_kz_trgm", "title_kz"),
+        _trigram_index("ix_keywords_title_en_trgm", "title_en"),
+        _trigram_index("ix_keywords_title_ru_trgm", "title_ru"),
+    )
+
+
+# Конфигурации текстового поиска по языкам полей статьи
+SEARCH_CONFIGS = ("simple", "english", "russian")
+
+ARTICLE_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(title_kz, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(title_en, '')), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(title_ru, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(abstract_kz, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(abstract_en, '')), 'B') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(abstract_ru, '')), 'B')"
+)
+
 
 class Article(Base):
     __tablename__ = "articles"
@@ -128,6 +171,10 @@ class Article(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     current_version_id = Column(Integer, ForeignKey("article_versions.id"), nullable=True)
+    # Полнотекстовый индекс по заголовкам и аннотациям на трёх языках
+    # (генерируемая колонка, см. миграцию 20251201_01). Для казахского
+    # в PostgreSQL нет конфигурации, поэтому используется 'simple'.
+    search_vector = deferred(Column(TSVECTOR, Computed(ARTICLE_SEARCH_VECTOR, persisted=True)))
 
     # Explicit foreign_keys to avoid ambiguity with current_version_id
     versions = relationship(
@@ -139,6 +186,19 @@ class Article(Base):
     keywords = relationship("Keyword", secondary=article_keywords, back_populates="articles")
     volumes = relationship("Volume", secondary=volume_articles, back_populates="articles")
 
+    __table_args__ = (
+        Index("ix_articles_search_vector", "search_vector", postgresql_using="gin"),
+        # Индексы горячих запросов (миграция 20251201_03)
+        Index("ix_articles_responsible_user_created", responsible_user_id, created_at.desc()),
+        Index("ix_articles_status_created_id", status, created_at.desc(), id.desc()),
+        Index("ix_articles_created_id", created_at.desc(), id.desc()),
+        Index(
+            "ix_articles_assigned_editor_id",
+            assigned_editor_id,
+            postgresql_where=assigned_editor_id.isnot(None),
+        ),
+    )
+
 
 class ArticleVersion(Base):
     __tablename__ = "article_versions"
@@ -148,15 +208,19 @@ class ArticleVersion(Base):
     version_number = Column(Integer, nullable=False)
     version_code = Column(String, nullable=True)
     
-    # Полный снимок статьи на момент создания версии
-    title_kz = Column(String, nullable=False)
-    title_en = Column(String, nullable=False)
-    title_ru = Column(String, nullable=False)
+    # Полный снимок статьи на момент создания версии.
+    # У версий-дельт (is_keyframe = false) колонки снимка пустые, а измененные
+    # относительно предыдущей версии поля лежат в delta (см. app/versioning.py)
+    is_keyframe = Column(Boolean, nullable=False, default=True, server_default=true())
+    delta = Column(JSON(none_as_null=True), nullable=True)
+    title_kz = Column(String, nullable=True)
+    title_en = Column(String, nullable=True)
+    title_ru = Column(String, nullable=True)
     abstract_kz = Column(String, nullable=True)
     abstract_en = Column(String, nullable=True)
     abstract_ru = Column(String, nullable=True)
     doi = Column(String, nullable=True)
-    article_type = Column(Enum(ArticleType), nullable=False)
+    article_type = Column(Enum(ArticleType), nullable=True)
     
     # Файлы
     manuscript_file_url = Column(String, nullable=True)
@@ -185,6 +249,10 @@ class ArticleVersion(Base):
     authors = relationship("Author", secondary=article_version_authors)
     keywords = relationship("Keyword", secondary=article_version_keywords)
 
+    __table_args__ = (
+        Index("ix_article_versions_article_number", article_id, version_number.desc()),
+    )
+
 
 class Volume(Base):
     __tablename__ = "volumes"
@@ -201,3 +269,7 @@ class Volume(Base):
     is_active = Column(Boolean, default=True)
 
     articles = relationship("Article", secondary=volume_articles, back_populates="volumes")
+
+    __table_args__ = (
+        Index("ix_volumes_year_number", year, number),
+    )
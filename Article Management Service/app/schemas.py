@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -107,6 +107,47 @@ class ArticleVersionOut(BaseModel):
         orm_mode = True
 
 
+class VersionRef(BaseModel):
+    id: int
+    version_number: int
+    version_code: Optional[str] = None
+
+
+class WordDiffOp(BaseModel):
+    op: str  # equal | delete | insert
+    text: str
+
+
+class FieldDiff(BaseModel):
+    field: str
+    old: Optional[Any] = None
+    new: Optional[Any] = None
+    # Пословный diff, только для заголовков и аннотаций
+    words: Optional[List[WordDiffOp]] = None
+
+
+class AuthorSetDiff(BaseModel):
+    added: List[AuthorOut] = Field(default_factory=list)
+    removed: List[AuthorOut] = Field(default_factory=list)
+    unchanged_count: int = 0
+
+
+class KeywordSetDiff(BaseModel):
+    added: List[KeywordOut] = Field(default_factory=list)
+    removed: List[KeywordOut] = Field(default_factory=list)
+    unchanged_count: int = 0
+
+
+class ArticleVersionDiffOut(BaseModel):
+    article_id: int
+    from_version: VersionRef
+    to_version: VersionRef
+    # Только изменившиеся поля снимка
+    fields: List[FieldDiff] = Field(default_factory=list)
+    authors: AuthorSetDiff
+    keywords: KeywordSetDiff
+
+
 class ArticleCreate(BaseModel):
     title_kz: str
     title_en: str
@@ -0,0 +1,126 @@
+"""
+Сравнение двух версий статьи.
+
+Возвращает только изменившиеся поля снимка; для заголовков и аннотаций
+дополнительно пословный diff (difflib), для авторов и ключевых слов —
+добавленные и удаленные. Версии неизменяемы, поэтому по паре id версий
+кэшируются изменившиеся поля и наборы id авторов и ключевых слов. Сами
+авторы и ключевые слова редактируются, их данные читаются при каждом запросе.
+"""
+import difflib
+import re
+from enum import Enum
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import config, models, versioning
+
+# Поля с пословным diff
+TEXT_FIELDS = ("title_kz", "title_en", "title_ru", "abstract_kz", "abstract_en", "abstract_ru")
+# file_url дублирует manuscript_file_url, в diff не выводится
+DIFF_FIELDS = tuple(field for field in versioning.VERSION_FIELDS if field != "file_url")
+
+# Слова вместе с пробелами между ними, чтобы склейка фрагментов давала исходный текст
+_TOKEN = re.compile(r"\s+|[^\s]+")
+
+# (id версии a, id версии b) -> (fields, id авторов a и b, id ключевых слов a и b)
+_cache = versioning.LRUCache(config.VERSION_DIFF_CACHE_SIZE)
+
+
+def _plain(value):
+    return value.value if isinstance(value, Enum) else value
+
+
+def word_diff(old: str | None, new: str | None) -> list[dict]:
+    """Пословный diff: фрагменты {"op": "equal" | "delete" | "insert", "text": ...}."""
+    old_tokens = _TOKEN.findall(old or "")
+    new_tokens = _TOKEN.findall(new or "")
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag in ("equal", "delete", "replace") and i1 != i2:
+            ops.append({"op": "equal" if tag == "equal" else "delete", "text": "".join(old_tokens[i1:i2])})
+        if tag in ("insert", "replace") and j1 != j2:
+            ops.append({"op": "insert", "text": "".join(new_tokens[j1:j2])})
+    return ops
+
+
+def _links(db: Session, table, column: str, version_ids: tuple[int, int]) -> dict[int, set[int]]:
+    result = {version_id: set() for version_id in version_ids}
+    rows = db.execute(
+        select(table.c.version_id, table.c[column]).where(table.c.version_id.in_(version_ids))
+    ).all()
+    for version_id, target_id in rows:
+        result[version_id].add(target_id)
+    return result
+
+
+def _set_diff(db: Session, model, old_ids: frozenset[int], new_ids: frozenset[int]) -> dict:
+    changed = old_ids ^ new_ids
+    by_id = {}
+    if changed:
+        columns = [column.key for column in model.__table__.columns]
+        by_id = {
+            item.id: {column: getattr(item, column) for column in columns}
+            for item in db.query(model).filter(model.id.in_(changed))
+        }
+    return {
+        "added": [by_id[i] for i in sorted(new_ids - old_ids) if i in by_id],
+        "removed": [by_id[i] for i in sorted(old_ids - new_ids) if i in by_id],
+        "unchanged_count": len(old_ids & new_ids),
+    }
+
+
+def _compare(db: Session, article_id: int, version_a: int, version_b: int, version_ids: tuple[int, int]) -> tuple:
+    """Неизменяемая часть diff: поля снимков и наборы id связей обеих версий."""
+    old_state = versioning.reconstruct(db, article_id, version_a)
+    new_state = versioning.reconstruct(db, article_id, version_b)
+    fields = []
+    for field in DIFF_FIELDS:
+        if old_state[field] == new_state[field]:
+            continue
+        change = {"field": field, "old": _plain(old_state[field]), "new": _plain(new_state[field])}
+        if field in TEXT_FIELDS:
+            change["words"] = word_diff(old_state[field], new_state[field])
+        fields.append(change)
+
+    authors = _links(db, models.article_version_authors, "author_id", version_ids)
+    keywords = _links(db, models.article_version_keywords, "keyword_id", version_ids)
+    return (
+        fields,
+        tuple(frozenset(authors[version_id]) for version_id in version_ids),
+        tuple(frozenset(keywords[version_id]) for version_id in version_ids),
+    )
+
+
+def diff_versions(db: Session, article_id: int, version_a: int, version_b: int) -> dict | None:
+    """Diff версии version_a -> version_b (номера версий). None, если одной из версий нет."""
+    rows = db.execute(
+        select(models.ArticleVersion.id, models.ArticleVersion.version_number, models.ArticleVersion.version_code)
+        .where(
+            models.ArticleVersion.article_id == article_id,
+            models.ArticleVersion.version_number.in_((version_a, version_b)),
+        )
+        .order_by(models.ArticleVersion.id)
+    ).all()
+    versions = {row.version_number: row for row in rows}
+    if version_a not in versions or version_b not in versions:
+        return None
+    old, new = versions[version_a], versions[version_b]
+
+    key = (old.id, new.id)
+    cached = _cache.get(key)
+    if cached is None:
+        cached = _compare(db, article_id, version_a, version_b, key)
+        _cache.put(key, cached)
+    fields, (old_authors, new_authors), (old_keywords, new_keywords) = cached
+
+    return {
+        "article_id": article_id,
+        "from_version": {"id": old.id, "version_number": old.version_number, "version_code": old.version_code},
+        "to_version": {"id": new.id, "version_number": new.version_number, "version_code": new.version_code},
+        "fields": fields,
+        "authors": _set_diff(db, models.Author, old_authors, new_authors),
+        "keywords": _set_diff(db, models.Keyword, old_keywords, new_keywords),
+    }
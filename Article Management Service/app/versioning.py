@@ -0,0 +1,225 @@
+"""
+Хранение версий статей: ключевые кадры и дельты.
+
+В режиме VERSION_STORAGE=full (по умолчанию) каждая версия — полный снимок
+полей статьи, как раньше. В режиме delta полный снимок (ключевой кадр)
+пишется раз в VERSION_KEYFRAME_INTERVAL версий, а в промежуточных версиях
+колонки снимка пустые (NULL) и в колонке delta хранятся только поля,
+изменившиеся относительно предыдущей версии.
+
+Перед отдачей наружу версии материализуются (materialize): поля
+восстанавливаются проходом от ближайшего ключевого кадра по дельтам и
+записываются в объект через set_committed_value, не помечая его измененным,
+поэтому schemas.ArticleVersionOut не меняется. Восстановленные снимки
+кэшируются по id версии: после создания версия не меняется.
+"""
+import threading
+from collections import OrderedDict
+from enum import Enum
+
+from sqlalchemy import func, inspect, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app import config, models
+
+# Поля статьи, которые копируются в версию (file_url — legacy-копия manuscript_file_url)
+VERSION_FIELDS = (
+    "title_kz",
+    "title_en",
+    "title_ru",
+    "abstract_kz",
+    "abstract_en",
+    "abstract_ru",
+    "doi",
+    "article_type",
+    "manuscript_file_url",
+    "antiplagiarism_file_url",
+    "author_info_file_url",
+    "cover_letter_file_url",
+    "not_published_elsewhere",
+    "plagiarism_free",
+    "authors_agree",
+    "generative_ai_info",
+    "file_url",
+)
+
+# Enum-поля хранятся в дельте (JSON) по значению
+_ENUM_FIELDS = {"article_type": models.ArticleType}
+
+
+class LRUCache:
+    """Потокобезопасный LRU-кэш неизменяемых значений (версии статей не меняются)."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+# id версии -> восстановленные поля снимка
+_cache = LRUCache(config.VERSION_CACHE_SIZE)
+
+
+def snapshot(article: models.Article) -> dict:
+    """Поля статьи, которые сохраняет версия."""
+    state = {field: getattr(article, field) for field in VERSION_FIELDS if field != "file_url"}
+    state["file_url"] = article.manuscript_file_url
+    return state
+
+
+def _encode(value):
+    return value.value if isinstance(value, Enum) else value
+
+
+def _apply(state: dict, delta: dict | None) -> dict:
+    result = dict(state)
+    for field, value in (delta or {}).items():
+        if field in _ENUM_FIELDS and value is not None:
+            value = _ENUM_FIELDS[field](value)
+        result[field] = value
+    return result
+
+
+def _chain(db: Session, article_id: int, version_number: int) -> list[tuple[int, dict]]:
+    """
+    Восстанавливает версии статьи от последнего ключевого кадра не позже
+    version_number до version_number включительно (один запрос по индексу
+    article_id, version_number). Возвращает [(id версии, поля)] по порядку.
+    """
+    version = models.ArticleVersion
+    keyframe = (
+        select(func.max(version.version_number))
+        .where(
+            version.article_id == article_id,
+            version.is_keyframe.is_(True),
+            version.version_number <= version_number,
+        )
+        .scalar_subquery()
+    )
+    rows = db.execute(
+        select(version.id, version.is_keyframe, version.delta, *(getattr(version, f) for f in VERSION_FIELDS))
+        .where(
+            version.article_id == article_id,
+            version.version_number >= func.coalesce(keyframe, 0),
+            version.version_number <= version_number,
+        )
+        .order_by(version.version_number, version.id)
+    ).all()
+
+    result = []
+    state = None
+    for row in rows:
+        if row.is_keyframe:
+            state = {field: getattr(row, field) for field in VERSION_FIELDS}
+        elif state is None:
+            # Дельта без ключевого кадра перед ней: цепочка повреждена
+            raise RuntimeError(f"Article {article_id} version chain has no keyframe before version id {row.id}")
+        else:
+            state = _apply(state, row.delta)
+            _cache.put(row.id, state)
+        result.append((row.id, state))
+    return result
+
+
+def reconstruct(db: Session, article_id: int, version_number: int) -> dict | None:
+    """Поля версии version_number статьи (None, если такой версии нет)."""
+    version_id = db.execute(
+        select(models.ArticleVersion.id).where(
+            models.ArticleVersion.article_id == article_id,
+            models.ArticleVersion.version_number == version_number,
+        ).order_by(models.ArticleVersion.id.desc()).limit(1)
+    ).scalar()
+    if version_id is None:
+        return None
+    cached = _cache.get(version_id)
+    if cached is not None:
+        return dict(cached)
+    return dict(dict(_chain(db, article_id, version_number))[version_id])
+
+
+def storage_columns(db: Session, article_id: int, version_number: int, state: dict) -> dict:
+    """
+    Значения колонок новой версии: полный снимок или дельта к предыдущей версии
+    в зависимости от VERSION_STORAGE и расстояния до последнего ключевого кадра.
+    """
+    keyframe = {**state, "is_keyframe": True, "delta": None}
+    if config.VERSION_STORAGE != "delta":
+        return keyframe
+    chain = _chain(db, article_id, version_number - 1)
+    if not chain or len(chain) >= config.VERSION_KEYFRAME_INTERVAL:
+        return keyframe
+    previous = chain[-1][1]
+    delta = {field: _encode(value) for field, value in state.items() if previous.get(field) != value}
+    return {**{field: None for field in VERSION_FIELDS}, "is_keyframe": False, "delta": delta}
+
+
+def fill(version: models.ArticleVersion, state: dict) -> None:
+    """Записывает поля снимка в объект версии без пометки об изменении и кэширует их."""
+    if not version.is_keyframe:
+        _cache.put(version.id, state)
+    for field, value in state.items():
+        set_committed_value(version, field, value)
+
+
+def materialize(db: Session, versions, complete: bool = False) -> None:
+    """
+    Восстанавливает поля версий-дельт. complete=True означает, что переданы
+    все версии статьи (коллекция Article.versions): тогда дельты применяются
+    по порядку в памяти, без запросов к БД.
+    """
+    by_article: dict[int, list] = {}
+    for version in versions:
+        by_article.setdefault(version.article_id, []).append(version)
+
+    for article_id, items in by_article.items():
+        items.sort(key=lambda v: (v.version_number, v.id))
+        state = None
+        missing = []
+        for version in items:
+            if version.is_keyframe:
+                state = {field: getattr(version, field) for field in VERSION_FIELDS}
+                continue
+            cached = _cache.get(version.id)
+            if cached is not None:
+                state = cached
+            elif complete and state is not None:
+                state = _apply(state, version.delta)
+            else:
+                state = None
+                missing.append(version)
+                continue
+            fill(version, state)
+
+        states: dict[int, dict] = {}
+        for version in missing:
+            if version.id not in states:
+                states.update(_chain(db, article_id, version.version_number))
+            fill(version, states[version.id])
+
+
+def materialize_articles(db: Session, articles) -> None:
+    """Материализует уже загруженные коллекции Article.versions."""
+    for article in articles:
+        if "versions" not in inspect(article).unloaded:
+            materialize(db, article.versions, complete=True)
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Header
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, selectinload
 from typing import List
 from jose import jwt, JWTError
-from app import models, schemas, database, config
+from app import models, schemas, database, config, versioning
+from app.loading import ARTICLE_OUT
 
 router = APIRouter(prefix="/volumes", tags=["volumes"])
 
@@ -45,8 +46,7 @@ def list_volumes(
     active_only: bool = True,
 ):
     query = db.query(models.Volume).options(
-        joinedload(models.Volume.articles).joinedload(models.Article.authors),
-        joinedload(models.Volume.articles).joinedload(models.Article.keywords),
+        selectinload(models.Volume.articles).options(*ARTICLE_OUT),
     )
     if year is not None:
         query = query.filter(models.Volume.year == year)
@@ -58,24 +58,32 @@ def list_volumes(
         query = query.filter(models.Volume.is_active.is_(True))
     # Порядок новее раньше
     volumes = query.order_by(models.Volume.year.desc(), models.Volume.number.desc()).all()
+    versioning.materialize_articles(db, [article for volume in volumes for article in volume.articles])
     return volumes
 
 
-@router.get("/{volume_id}", response_model=schemas.VolumeOut)
-def get_volume(
-    volume_id: int,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
-):
+def _load_volume(db: Session, volume_id: int) -> models.Volume | None:
+    """Том со статьями и их версиями (версии-дельты материализованы)."""
     volume = (
         db.query(models.Volume)
         .options(
-            joinedload(models.Volume.articles).joinedload(models.Article.authors),
-            joinedload(models.Volume.articles).joinedload(models.Article.keywords),
+            selectinload(models.Volume.articles).options(*ARTICLE_OUT),
         )
         .filter(models.Volume.id == volume_id)
         .first()
     )
+    if volume:
+        versioning.materialize_articles(db, volume.articles)
+    return volume
+
+
+@router.get("/{volume_id}", response_model=schemas.VolumeOut)
+def get_volume(
+    volume_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    volume = _load_volume(db, volume_id)
     if not volume:
         raise HTTPException(status_code=404, detail="Volume not found")
     return volume
@@ -125,8 +133,7 @@ def create_volume(
             db.execute(models.volume_articles.insert().values(volume_id=volume.id, article_id=article.id))
 
     db.commit()
-    db.refresh(volume)
-    return volume
+    return _load_volume(db, volume.id)
 
 
 @router.put("/{volume_id}", response_model=schemas.VolumeOut)
@@ -178,8 +185,7 @@ def update_volume(
                 db.execute(models.volume_articles.insert().values(volume_id=volume.id, article_id=article.id))
 
     db.commit()
-    db.refresh(volume)
-    return volume
+    return _load_volume(db, volume.id)
 
 
 @router.delete("/{volume_id}", status_code=204)
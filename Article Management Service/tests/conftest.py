@@ -0,0 +1,214 @@
+"""
+Общие фикстуры тестов сервиса статей.
+
+По умолчанию тесты идут на временной SQLite-базе, схема создается из
+моделей: tsvector хранится как TEXT, генерируемая колонка search_vector
+становится обычной. Если задан TEST_DATABASE_URL (PostgreSQL), тесты идут
+на нем и включаются тесты с маркой postgres, иначе они пропускаются;
+схема PostgreSQL пересоздается и доводится до head миграциями alembic.
+
+Каждый тест работает внутри внешней транзакции, которая в конце
+откатывается; commit() в обработчиках фиксирует только SAVEPOINT.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+    os.environ["ASYNC_DATABASE_URL"] = TEST_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+else:
+    _db_file = os.path.join(tempfile.mkdtemp(prefix="articles-tests-"), "articles.db")
+    # Обработчики (def) выполняются в пуле потоков TestClient на соединении теста
+    os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}?check_same_thread=false"
+    os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_file}"
+
+import pytest  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from jose import jwt  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+from sqlalchemy.dialects.postgresql import TSVECTOR  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import articles_router, config, database, models, version_diff, versioning, volumes_router  # noqa: E402
+
+IS_POSTGRES = database.engine.dialect.name == "postgresql"
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+# Ревизия перед 20251201_*: от нее схема накатывается миграциями до head
+MIGRATIONS_BASE = "20251130_04"
+
+
+@compiles(TSVECTOR, "sqlite")
+def _tsvector_as_text(type_, compiler, **kw):
+    return "TEXT"
+
+
+def _alembic_config():
+    from alembic.config import Config
+
+    # Без файла конфигурации: env.py не перенастраивает логирование pytest,
+    # URL базы он берет из app.config
+    alembic_cfg = Config()
+    alembic_cfg.set_main_option("script_location", str(SERVICE_DIR / "alembic"))
+    return alembic_cfg
+
+
+def _create_schema():
+    if not IS_POSTGRES:
+        # to_tsvector в SQLite нет: колонка остается, но не вычисляется
+        models.Article.__table__.c.search_vector.computed = None
+        models.Base.metadata.create_all(database.engine)
+        return
+
+    from alembic import command
+
+    # Цепочка миграций начинается не с пустой базы (первая ревизия меняет
+    # уже существующий enum), поэтому схема создается из моделей, затем
+    # откатывается до MIGRATIONS_BASE и накатывается до head: индексы,
+    # search_vector и колонки дельт тестов создают сами миграции
+    with database.engine.begin() as connection:
+        # Тестовая база: таблицы, enum-типы и alembic_version с прошлого запуска
+        connection.execute(text("DROP SCHEMA public CASCADE"))
+        connection.execute(text("CREATE SCHEMA public"))
+    models.Base.metadata.create_all(database.engine)
+    alembic_cfg = _alembic_config()
+    command.stamp(alembic_cfg, "head")
+    command.downgrade(alembic_cfg, MIGRATIONS_BASE)
+    # Явно объявленных Index до MIGRATIONS_BASE не было (кроме index=True
+    # колонок): то, что пережило downgrade, удаляется, иначе upgrade с
+    # if_not_exists не заметил бы индекс, которого нет в миграциях
+    with database.engine.begin() as connection:
+        for table in models.Base.metadata.tables.values():
+            column_indexes = {f"ix_{table.name}_{column.name}" for column in table.columns if column.index}
+            for index in table.indexes:
+                if index.name not in column_indexes:
+                    connection.execute(text(f'DROP INDEX IF EXISTS "{index.name}"'))
+    command.upgrade(alembic_cfg, "head")
+
+
+if not IS_POSTGRES:
+    # pysqlite сам откладывает BEGIN и ломает SAVEPOINT: транзакциями
+    # управляет SQLAlchemy, иначе откат теста ничего не откатывает
+    @event.listens_for(database.engine, "connect")
+    def _sqlite_autocommit_driver(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(database.engine, "begin")
+    def _sqlite_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+
+_create_schema()
+
+
+def pytest_collection_modifyitems(config, items):
+    if IS_POSTGRES:
+        return
+    skip = pytest.mark.skip(reason="нужен PostgreSQL: задайте TEST_DATABASE_URL")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(autouse=True)
+def _clear_version_caches():
+    # id версий в SQLite после отката переиспользуются, кэши не должны их помнить
+    versioning._cache.clear()
+    version_diff._cache.clear()
+
+
+@pytest.fixture
+def db():
+    with database.engine.connect() as connection:
+        outer = connection.begin()
+        session = Session(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            yield session
+        finally:
+            session.close()
+            outer.rollback()
+
+
+def make_app(session: Session) -> FastAPI:
+    """Приложение с роутерами сервиса, работающими на сессии теста."""
+    app = FastAPI()
+    app.include_router(articles_router.router)
+    app.include_router(volumes_router.router)
+    app.dependency_overrides[articles_router.get_db] = lambda: session
+    app.dependency_overrides[volumes_router.get_db] = lambda: session
+    return app
+
+
+@pytest.fixture
+def client(db):
+    with TestClient(make_app(db)) as test_client:
+        yield test_client
+
+
+class StatementCounter:
+    """
+    Считает SQL-выражения, выполненные движком внутри блока with
+    (служебные SAVEPOINT/RELEASE тестовой транзакции не считаются).
+    Параметры драйвера сохраняются рядом, чтобы выражение можно было
+    повторить, например под EXPLAIN.
+    """
+
+    def __init__(self):
+        self.statements: list[str] = []
+        self.parameters: list = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(("SAVEPOINT", "RELEASE", "ROLLBACK TO")):
+            self.statements.append(statement)
+            self.parameters.append(parameters)
+
+    def __enter__(self):
+        event.listen(database.engine, "after_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(database.engine, "after_cursor_execute", self._record)
+
+    def __len__(self):
+        return len(self.statements)
+
+
+def auth(user_id: int, *roles: str) -> dict:
+    """Заголовок Authorization с JWT пользователя."""
+    token = jwt.encode(
+        {"sub": str(user_id), "roles": list(roles) or ["author"]},
+        config.SECRET_KEY,
+        algorithm=config.ALGORITHM,
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+def make_authors(db: Session, count: int, prefix: str = "author") -> list[int]:
+    authors = [
+        models.Author(
+            email=f"{prefix}{i}@example.com",
+            prefix="Dr",
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            country="KZ",
+            affiliation1="University",
+        )
+        for i in range(count)
+    ]
+    db.add_all(authors)
+    db.flush()
+    return [author.id for author in authors]
+
+
+def make_keywords(db: Session, count: int, prefix: str = "keyword") -> list[int]:
+    keywords = [
+        models.Keyword(title_kz=f"{prefix} {i}", title_en=f"{prefix} {i}", title_ru=f"{prefix} {i}")
+        for i in range(count)
+    ]
+    db.add_all(keywords)
+    db.flush()
+    return [keyword.id for keyword in keywords]
@@ -0,0 +1,111 @@
+"""
+Связи статьи и ее версий с авторами и ключевыми словами пишутся
+многострочным INSERT: число выражений на запрос не зависит от числа связей.
+"""
+from collections import Counter
+
+from sqlalchemy import func, select
+
+from app import models
+from tests.conftest import StatementCounter, auth, make_authors, make_keywords
+
+USER_ID = 1
+
+
+def _link_count(db, table, column: str, owner_id: int) -> int:
+    return db.execute(select(func.count()).select_from(table).where(table.c[column] == owner_id)).scalar()
+
+
+def _create_article(client, author_ids, keyword_ids) -> int:
+    response = client.post(
+        "/articles/by_ids",
+        json={
+            "title_kz": "Мақала",
+            "title_en": "Article",
+            "title_ru": "Статья",
+            "responsible_user_id": USER_ID,
+            "author_ids": author_ids,
+            "keyword_ids": keyword_ids,
+        },
+        headers=auth(USER_ID),
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def _update(client, article_id: int, author_ids, keyword_ids):
+    with StatementCounter() as counter:
+        response = client.put(
+            f"/articles/{article_id}",
+            json={"title_en": "Updated", "author_ids": author_ids, "keyword_ids": keyword_ids},
+            headers=auth(USER_ID),
+        )
+    assert response.status_code == 200, response.text
+    return response.json(), counter
+
+
+def test_create_inserts_unique_links(client, db):
+    author_ids = make_authors(db, 3)
+    keyword_ids = make_keywords(db, 2)
+
+    article_id = _create_article(client, author_ids + author_ids[:1], keyword_ids * 2)
+
+    assert _link_count(db, models.article_authors, "article_id", article_id) == 3
+    assert _link_count(db, models.article_keywords, "article_id", article_id) == 2
+
+
+def test_update_rewrites_article_and_version_links(client, db):
+    author_ids = make_authors(db, 6)
+    keyword_ids = make_keywords(db, 6)
+    article_id = _create_article(client, author_ids[:2], keyword_ids[:2])
+
+    body, _ = _update(client, article_id, author_ids[2:] + author_ids[2:3], keyword_ids[3:])
+
+    version = max(body["versions"], key=lambda v: v["version_number"])
+    version_id = version["id"]
+    assert _link_count(db, models.article_authors, "article_id", article_id) == 4
+    assert _link_count(db, models.article_keywords, "article_id", article_id) == 3
+    assert _link_count(db, models.article_version_authors, "version_id", version_id) == 4
+    assert _link_count(db, models.article_version_keywords, "version_id", version_id) == 3
+    # Версия хранит новый состав авторов, а не загруженный до перезаписи связей
+    assert sorted(author["id"] for author in version["authors"]) == author_ids[2:]
+    assert sorted(keyword["id"] for keyword in version["keywords"]) == keyword_ids[3:]
+
+
+def test_update_statement_count_does_not_depend_on_link_count(client, db):
+    author_ids = make_authors(db, 20)
+    keyword_ids = make_keywords(db, 20)
+    article_id = _create_article(client, author_ids[:1], keyword_ids[:1])
+    # Первая версия статьи создается без предыдущей, ее не сравниваем
+    _update(client, article_id, author_ids[:1], keyword_ids[:1])
+
+    _, few = _update(client, article_id, author_ids[:2], keyword_ids[:2])
+    _, many = _update(client, article_id, author_ids[2:], keyword_ids[2:])
+
+    assert len(many) == len(few)
+    inserts = Counter(
+        statement.split()[2] for statement in many.statements if statement.lstrip().upper().startswith("INSERT")
+    )
+    # По одному INSERT на каждую таблицу связей, плюс сама версия
+    assert inserts == {
+        "article_authors": 1,
+        "article_keywords": 1,
+        "article_versions": 1,
+        "article_version_authors": 1,
+        "article_version_keywords": 1,
+    }
+
+
+def test_update_with_unknown_author_keeps_links(client, db):
+    author_ids = make_authors(db, 2)
+    keyword_ids = make_keywords(db, 1)
+    article_id = _create_article(client, author_ids, keyword_ids)
+
+    response = client.put(
+        f"/articles/{article_id}",
+        json={"author_ids": [author_ids[0], max(author_ids) + 100]},
+        headers=auth(USER_ID),
+    )
+
+    assert response.status_code == 400
+    assert _link_count(db, models.article_authors, "article_id", article_id) == 2
@@ -0,0 +1,138 @@
+"""
+Фильтры /articles/unassigned по имени автора и ключевым словам (EXISTS
+через .any()) отдают те же статьи, что прежний JOIN с DISTINCT, и каждую
+один раз, даже если совпало несколько авторов или ключевых слов.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import or_
+
+from app import models
+from tests.conftest import auth
+
+EDITOR_ID = 2
+START = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+
+def _author(first_name: str, last_name: str, patronymic: str | None = None) -> models.Author:
+    return models.Author(
+        email=f"{first_name}.{last_name}.{patronymic}@example.com".lower(),
+        first_name=first_name,
+        last_name=last_name,
+        patronymic=patronymic,
+        country="KZ",
+        affiliation1="University",
+    )
+
+
+def _keyword(title: str) -> models.Keyword:
+    return models.Keyword(title_kz=f"{title} kz", title_en=title, title_ru=f"{title} ru")
+
+
+@pytest.fixture
+def articles(db):
+    """id статей с несколькими подходящими авторами и ключевыми словами."""
+    smith = _author("Anna", "Smith")
+    smithson = _author("Boris", "Smithson")
+    ivanov = _author("Ivan", "Ivanov", patronymic="Smithovich")
+    petrov = _author("Petr", "Petrov")
+    graphs = _keyword("graph theory")
+    graph_nets = _keyword("graph networks")
+    proteins = _keyword("proteins")
+    links = [
+        ([smith, smithson], [graphs, graph_nets]),
+        ([petrov], [proteins]),
+        ([petrov, ivanov], [graph_nets, proteins]),
+        ([], []),
+        ([smith, ivanov, smithson], [graphs, proteins]),
+    ]
+    articles = [
+        models.Article(
+            title_kz=f"Мақала {i}",
+            title_en=f"Article {i}",
+            title_ru=f"Статья {i}",
+            status=models.ArticleStatus.submitted,
+            responsible_user_id=1,
+            created_at=START + timedelta(minutes=i),
+            authors=authors,
+            keywords=keywords,
+        )
+        for i, (authors, keywords) in enumerate(links)
+    ]
+    db.add_all(articles)
+    db.flush()
+    ids = [article.id for article in articles]
+    # Обратные связи (author.articles), заполненные в памяти, ответ
+    # эндпоинта сериализовал бы по кругу; в запросе они не загружены
+    db.expire_all()
+    return ids
+
+
+def _filtered(client, **params) -> list[int]:
+    response = client.get(
+        "/articles/unassigned",
+        params={**params, "exact_count": True, "page_size": 100},
+        headers=auth(EDITOR_ID, "editor"),
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    ids = [item["id"] for item in body["items"]]
+    assert len(ids) == len(set(ids))
+    assert body["pagination"]["total_count"] == len(ids)
+    return ids
+
+
+def _joined(db, relationship, condition) -> list[int]:
+    """Прежняя реализация фильтра: JOIN связанной таблицы и DISTINCT."""
+    rows = (
+        db.query(models.Article.id, models.Article.created_at)
+        .join(relationship)
+        .filter(models.Article.status == models.ArticleStatus.submitted, condition)
+        .distinct()
+        .order_by(models.Article.created_at.desc(), models.Article.id.desc())
+        .all()
+    )
+    return [row.id for row in rows]
+
+
+@pytest.mark.parametrize("name", ["smith", "SMITH", "anna", "ovich", "petr", "nobody"])
+def test_author_name_filter_matches_join(client, db, articles, name):
+    pattern = f"%{name}%"
+    expected = _joined(
+        db,
+        models.Article.authors,
+        or_(
+            models.Author.first_name.ilike(pattern),
+            models.Author.last_name.ilike(pattern),
+            models.Author.patronymic.ilike(pattern),
+        ),
+    )
+
+    assert _filtered(client, author_name=name) == expected
+
+
+def test_author_name_filter_returns_article_once(client, db, articles):
+    # У статей 0 и 4 по два-три подходящих автора
+    assert _filtered(client, author_name="smith") == [articles[4], articles[2], articles[0]]
+
+
+@pytest.mark.parametrize("keywords", ["graph", "graph, proteins", "NETWORKS", "theory,  ,missing", "missing"])
+def test_keywords_filter_matches_join(client, db, articles, keywords):
+    conditions = []
+    for keyword in (k.strip() for k in keywords.split(",") if k.strip()):
+        pattern = f"%{keyword}%"
+        conditions.append(
+            or_(
+                models.Keyword.title_kz.ilike(pattern),
+                models.Keyword.title_en.ilike(pattern),
+                models.Keyword.title_ru.ilike(pattern),
+            )
+        )
+    expected = _joined(db, models.Article.keywords, or_(*conditions))
+
+    assert _filtered(client, keywords=keywords) == expected
+
+
+def test_author_and_keyword_filters_combine(client, db, articles):
+    assert _filtered(client, author_name="smith", keywords="proteins") == [articles[4], articles[2]]
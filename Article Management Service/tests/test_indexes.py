@@ -0,0 +1,207 @@
+"""
+Горячие запросы эндпоинтов используют индексы из миграций 20251201_01
+(GIN по search_vector), 20251201_02 (trigram) и 20251201_03, а схема,
+которую строят миграции, совпадает с моделями.
+
+Планы строятся для тех SQL-выражений, которые эндпоинт действительно
+выполнил, на заполненной базе (десятки тысяч строк и свежая статистика
+ANALYZE), без запрета seq scan: выбор индекса — решение планировщика.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import database, models
+from tests.conftest import StatementCounter, auth, make_app
+
+pytestmark = pytest.mark.postgres
+
+ARTICLES = 20000
+AUTHORS = 10000
+KEYWORDS = 5000
+EDITOR_ID = 1
+
+# Статьи по часу с 2021-01-01: submitted — каждая сотая (остальные уже
+# прошли рецензирование), у каждого автора 20 статей, по две версии, два
+# автора и два ключевых слова на статью; маркер mN в аннотации у 10 статей
+SEED = [
+    f"""
+    INSERT INTO articles (id, title_kz, title_en, title_ru, abstract_en, status, article_type,
+                          responsible_user_id, assigned_editor_id, created_at,
+                          not_published_elsewhere, plagiarism_free, authors_agree)
+    SELECT i, 'Мақала ' || i, 'Article ' || i || ' on ' || (ARRAY['graphs', 'proteins', 'markets',
+           'glaciers', 'compilers'])[1 + i % 5], 'Статья ' || i, 'Abstract with marker m' || (i % 2000),
+           CASE WHEN i % 100 = 0 THEN 'submitted' ELSE (ARRAY['published', 'rejected', 'accepted',
+                'withdrawn', 'under_review', 'draft'])[1 + i % 6] END::articlestatus,
+           'original', 1000 + i % 1000, CASE WHEN i % 20 = 0 THEN 1 + i % 7 END,
+           timestamptz '2021-01-01' + i * interval '1 hour', true, true, true
+    FROM generate_series(1, {ARTICLES}) AS i
+    """,
+    f"""
+    INSERT INTO article_versions (id, article_id, version_number, version_code, is_keyframe,
+                                  title_kz, title_en, title_ru, article_type, created_at,
+                                  not_published_elsewhere, plagiarism_free, authors_agree, is_published)
+    SELECT (a - 1) * 2 + v, a, v, 'TAU-V' || v, true, 'Мақала ' || a, 'Article ' || a, 'Статья ' || a,
+           'original', timestamptz '2021-01-01' + a * interval '1 hour', true, true, true, false
+    FROM generate_series(1, {ARTICLES}) AS a, generate_series(1, 2) AS v
+    """,
+    f"""
+    INSERT INTO authors (id, email, first_name, last_name, country, affiliation1, is_corresponding)
+    SELECT i, 'author' || i || '@example.com', 'First' || i, initcap(substr(md5(i::text), 1, 10)),
+           'KZ', 'University', false
+    FROM generate_series(1, {AUTHORS}) AS i
+    """,
+    f"""
+    INSERT INTO keywords (id, title_kz, title_en, title_ru)
+    SELECT i, 'кілт ' || k, 'keyword ' || k, 'ключ ' || k
+    FROM generate_series(1, {KEYWORDS}) AS i, substr(md5('k' || i), 1, 8) AS k
+    """,
+    # 6i + 3 и 2i + 1 нечетны, поэтому пары (статья, автор/слово) не повторяются
+    f"""
+    INSERT INTO article_authors (article_id, author_id)
+    SELECT i, 1 + i % {AUTHORS} FROM generate_series(1, {ARTICLES}) AS i
+    UNION ALL
+    SELECT i, 1 + (7 * i + 3) % {AUTHORS} FROM generate_series(1, {ARTICLES}) AS i
+    """,
+    f"""
+    INSERT INTO article_keywords (article_id, keyword_id)
+    SELECT i, 1 + i % {KEYWORDS} FROM generate_series(1, {ARTICLES}) AS i
+    UNION ALL
+    SELECT i, 1 + (3 * i + 1) % {KEYWORDS} FROM generate_series(1, {ARTICLES}) AS i
+    """,
+    # Явные id не двигают последовательности: вставки тестов не должны с ними столкнуться
+    *(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+        for table in ("articles", "article_versions", "authors", "keywords")
+    ),
+    # Новые строки GIN-индекса лежат в pending list, пока его не разберет
+    # autovacuum; VACUUM в транзакции нельзя, поэтому список разбирается явно
+    """
+    SELECT gin_clean_pending_list(indexrelid)
+    FROM pg_index JOIN pg_class ON pg_class.oid = indexrelid JOIN pg_am ON pg_am.oid = relam
+    WHERE amname = 'gin'
+    """,
+    "ANALYZE",
+]
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    """Сессия на заполненной базе; данные откатываются после модуля."""
+    with database.engine.connect() as connection:
+        outer = connection.begin()
+        for statement in SEED:
+            connection.execute(text(statement))
+        session = Session(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            yield session
+        finally:
+            session.close()
+            outer.rollback()
+
+
+@pytest.fixture(scope="module")
+def seeded_client(seeded):
+    with TestClient(make_app(seeded)) as test_client:
+        yield test_client
+
+
+def _index_scans(plan: dict) -> set[str]:
+    """Имена индексов во всех узлах плана, читающих индекс."""
+    found = set()
+    if plan.get("Node Type") in INDEX_SCANS:
+        found.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        found |= _index_scans(child)
+    return found
+
+
+def _used_indexes(session: Session, client: TestClient, url: str, headers: dict) -> set[str]:
+    """Индексы в планах всех SELECT, которые выполнил GET url."""
+    with StatementCounter() as counter:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    used = set()
+    for statement, parameters in zip(counter.statements, counter.parameters):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            continue
+        plan = session.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        used |= _index_scans(plan[0]["Plan"])
+    return used
+
+
+# (URL, заголовки, индекс, который должен оказаться в плане)
+HOT_REQUESTS = [
+    ("/articles/my", auth(1007), "ix_articles_responsible_user_created"),
+    # Статьи submitted, новые первыми (keyset по статусу)
+    ("/articles/unassigned", auth(EDITOR_ID, "editor"), "ix_articles_status_created_id"),
+    ("/articles/unassigned?status=all", auth(EDITOR_ID, "editor"), "ix_articles_created_id"),
+    # Год — диапазон created_at, а не extract(year)
+    ("/articles/unassigned?status=all&year=2022", auth(EDITOR_ID, "editor"), "ix_articles_created_id"),
+    ("/articles/unassigned?status=all&search=m17", auth(EDITOR_ID, "editor"), "ix_articles_search_vector"),
+    # ILIKE '%x%' по именам авторов и ключевым словам — trigram-индексы
+    # (20251201_02), от совпавших строк к статьям — обратные индексы связей.
+    # Подстроки взяты из md5 фамилии автора 1 и ключевого слова 1.
+    ("/articles/unassigned?status=all&author_name=ca4238a", auth(EDITOR_ID, "editor"), "ix_authors_last_name_trgm"),
+    ("/articles/unassigned?status=all&author_name=ca4238a", auth(EDITOR_ID, "editor"), "ix_article_authors_author_id"),
+    ("/articles/unassigned?status=all&keywords=637b17", auth(EDITOR_ID, "editor"), "ix_keywords_title_en_trgm"),
+    ("/articles/unassigned?status=all&keywords=637b17", auth(EDITOR_ID, "editor"), "ix_article_keywords_keyword_id"),
+    # Версии статьи (selectinload по article_id)
+    ("/articles/editor/100", auth(EDITOR_ID, "editor"), "ix_article_versions_article_number"),
+]
+
+
+@pytest.mark.parametrize("url, headers, index_name", HOT_REQUESTS)
+def test_hot_request_uses_index(seeded, seeded_client, url, headers, index_name):
+    assert index_name in _used_indexes(seeded, seeded_client, url, headers)
+
+
+def test_next_page_uses_index(seeded, seeded_client):
+    headers = auth(EDITOR_ID, "editor")
+    first = seeded_client.get("/articles/unassigned", headers=headers).json()
+    cursor = first["pagination"]["next_cursor"]
+    url = f"/articles/unassigned?cursor={cursor}"
+    assert "ix_articles_status_created_id" in _used_indexes(seeded, seeded_client, url, headers)
+
+
+SCHEMA_SQL = """
+SELECT tablename, indexname, replace(indexdef, schemaname || '.', '')
+FROM pg_indexes WHERE schemaname = :schema
+"""
+COLUMNS_SQL = """
+SELECT table_name, column_name, data_type, udt_name, is_nullable, column_default, generation_expression
+FROM information_schema.columns WHERE table_schema = :schema
+"""
+
+
+def _schema(connection, schema: str) -> tuple[set, set]:
+    indexes = set(connection.execute(text(SCHEMA_SQL), {"schema": schema}).all())
+    columns = {
+        tuple(value.replace(f"{schema}.", "") if isinstance(value, str) else value for value in row)
+        for row in connection.execute(text(COLUMNS_SQL), {"schema": schema})
+    }
+    return indexes, columns
+
+
+def test_migrations_match_models():
+    # public построена миграциями (alembic upgrade head), рядом во временной
+    # схеме та же база из create_all по моделям; DDL откатывается
+    with database.engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            connection.execute(text("CREATE SCHEMA from_models"))
+            models.Base.metadata.create_all(
+                connection.execution_options(schema_translate_map={None: "from_models"})
+            )
+            migrated_indexes, migrated_columns = _schema(connection, "public")
+            model_indexes, model_columns = _schema(connection, "from_models")
+        finally:
+            transaction.rollback()
+
+    migrated_indexes = {row for row in migrated_indexes if row[0] != "alembic_version"}
+    migrated_columns = {row for row in migrated_columns if row[0] != "alembic_version"}
+    assert migrated_indexes == model_indexes
+    assert migrated_columns == model_columns
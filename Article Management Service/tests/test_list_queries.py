@@ -0,0 +1,98 @@
+"""
+Списки статей выполняют фиксированное число SQL-выражений независимо от
+числа статей, их версий, авторов и ключевых слов: коллекции догружаются
+через selectinload, а не запросом на каждую строку (N+1).
+"""
+from tests.conftest import StatementCounter, auth, make_authors, make_keywords
+
+AUTHOR_ID = 1
+EDITOR_ID = 2
+
+
+def _add_articles(client, db, count: int, status: str = "submitted") -> list[int]:
+    """Статьи с двумя авторами, двумя ключевыми словами и двумя версиями каждая."""
+    author_ids = make_authors(db, 4, prefix=f"{status}{count}-")
+    keyword_ids = make_keywords(db, 4, prefix=f"{status}{count}")
+    ids = []
+    for i in range(count):
+        response = client.post(
+            "/articles/by_ids",
+            json={
+                "title_kz": f"Мақала {i}",
+                "title_en": f"Article {i}",
+                "title_ru": f"Статья {i}",
+                "status": status,
+                "responsible_user_id": AUTHOR_ID,
+                "author_ids": author_ids[:2],
+                "keyword_ids": keyword_ids[:2],
+            },
+            headers=auth(AUTHOR_ID),
+        )
+        assert response.status_code == 200, response.text
+        article_id = response.json()["id"]
+        for version in range(2):
+            response = client.put(
+                f"/articles/{article_id}",
+                json={
+                    "title_en": f"Article {i} v{version}",
+                    "author_ids": author_ids[version:version + 2],
+                    "keyword_ids": keyword_ids[version:version + 2],
+                },
+                headers=auth(AUTHOR_ID),
+            )
+            assert response.status_code == 200, response.text
+        ids.append(article_id)
+    return ids
+
+
+def _count(client, url: str, user_id: int, *roles: str) -> tuple[int, int]:
+    """(число выражений, число статей в ответе) для GET url."""
+    with StatementCounter() as counter:
+        response = client.get(url, headers=auth(user_id, *roles))
+    assert response.status_code == 200, response.text
+    body = response.json()
+    if isinstance(body, dict):
+        items = body["items"]
+    elif body and "articles" in body[0]:
+        items = [article for volume in body for article in volume["articles"]]
+    else:
+        items = body
+    return len(counter), len(items)
+
+
+def _assert_constant(client, db, url: str, user_id: int, *roles: str, status: str = "submitted", volume=None):
+    ids = _add_articles(client, db, 2, status)
+    if volume:
+        volume(ids)
+    few, few_items = _count(client, url, user_id, *roles)
+    more_ids = _add_articles(client, db, 8, status)
+    if volume:
+        volume(more_ids)
+    many, many_items = _count(client, url, user_id, *roles)
+    assert (few_items, many_items) == (2, 10)
+    assert many == few
+
+
+def test_my_articles_statement_count_is_constant(client, db):
+    _assert_constant(client, db, "/articles/my", AUTHOR_ID)
+
+
+def test_unassigned_articles_statement_count_is_constant(client, db):
+    _assert_constant(
+        client, db, "/articles/unassigned?status=all&exact_count=true&page_size=100",
+        EDITOR_ID, "editor",
+    )
+
+
+def test_volumes_statement_count_is_constant(client, db):
+    number = iter(range(1, 100))
+
+    def volume(article_ids):
+        response = client.post(
+            "/volumes/",
+            json={"year": 2025, "number": next(number), "article_ids": article_ids},
+            headers=auth(EDITOR_ID, "editor"),
+        )
+        assert response.status_code == 201, response.text
+
+    _assert_constant(client, db, "/volumes/", EDITOR_ID, "editor", status="published", volume=volume)
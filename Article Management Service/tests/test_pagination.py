@@ -0,0 +1,153 @@
+"""
+Keyset-пагинация /articles/unassigned: проход по next_cursor отдает каждую
+подходящую статью ровно один раз в порядке сортировки, включая статьи с
+одинаковым created_at и порядок по релевантности; total_count без
+exact_count — оценка планировщика PostgreSQL.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app import models
+from tests.conftest import IS_POSTGRES, auth
+
+EDITOR_ID = 2
+START = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+
+def _add_articles(db, count: int, created_at=None, status=models.ArticleStatus.submitted, **fields) -> list[int]:
+    """Статьи по минуте от START (или все с одним created_at)."""
+    articles = [
+        models.Article(
+            title_kz=f"Мақала {i}",
+            title_en=f"Article {i}",
+            title_ru=f"Статья {i}",
+            status=status,
+            responsible_user_id=1,
+            created_at=created_at or START + timedelta(minutes=i),
+            **fields,
+        )
+        for i in range(count)
+    ]
+    db.add_all(articles)
+    db.flush()
+    return [article.id for article in articles]
+
+
+def _walk(client, url: str, page_size: int) -> list[dict]:
+    """Все страницы по next_cursor; проверяет, что страницы полные, кроме последней."""
+    items, cursor = [], None
+    for _ in range(100):
+        page_url = f"{url}&page_size={page_size}" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(page_url, headers=auth(EDITOR_ID, "editor"))
+        assert response.status_code == 200, response.text
+        body = response.json()
+        items.extend(body["items"])
+        cursor = body["pagination"]["next_cursor"]
+        assert body["pagination"]["has_next"] == (cursor is not None)
+        if cursor is None:
+            return items
+        assert len(body["items"]) == page_size
+    raise AssertionError(f"next_cursor не кончается: {len(items)} статей")
+
+
+def _exact(url: str) -> str:
+    # На SQLite нет EXPLAIN (FORMAT JSON): там считается точно
+    return url if IS_POSTGRES else f"{url}&exact_count=true"
+
+
+def test_cursor_walks_every_article_once(client, db):
+    ids = _add_articles(db, 23)
+
+    items = _walk(client, _exact("/articles/unassigned?status=submitted"), page_size=5)
+
+    assert [item["id"] for item in items] == ids[::-1]
+
+
+def test_cursor_breaks_created_at_ties_by_id(client, db):
+    ids = _add_articles(db, 4, created_at=START)
+    ids += _add_articles(db, 7, created_at=START + timedelta(days=1))
+    ids += _add_articles(db, 3, created_at=START)
+
+    # Границы страниц из 3 попадают внутрь групп с одинаковым created_at
+    items = _walk(client, _exact("/articles/unassigned?status=submitted"), page_size=3)
+
+    expected = sorted(ids[4:11], reverse=True) + sorted(ids[:4] + ids[11:], reverse=True)
+    assert [item["id"] for item in items] == expected
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-base64!",
+        "bnVsbA",  # null
+        "WyIyMDI1LTAzLTAxVDAwOjAwOjAwKzAwOjAwIl0",  # ["2025-03-01T00:00:00+00:00"]: не хватает id
+        "WyJ5ZXN0ZXJkYXkiLCAxXQ",  # ["yesterday", 1]
+        "WzEsIDJd",  # [1, 2]
+        "WyIyMDI1LTAzLTAxVDAwOjAwOjAwKzAwOjAwIiwgIjEiXQ",  # ["2025-03-01T00:00:00+00:00", "1"]
+    ],
+)
+def test_tampered_cursor_is_rejected(client, db, cursor):
+    _add_articles(db, 2)
+
+    response = client.get(
+        _exact(f"/articles/unassigned?status=submitted&cursor={cursor}"),
+        headers=auth(EDITOR_ID, "editor"),
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.postgres
+def test_rank_cursor_walks_search_results_once(client, db):
+    # Совпадение в заголовке весит больше, чем в аннотации; одинаковые
+    # тексты дают одинаковый ранг, и порядок внутри них решают created_at, id
+    in_title = _add_articles(db, 5)
+    for article_id in in_title:
+        db.get(models.Article, article_id).title_en = "Graph theory"
+    in_abstract = _add_articles(db, 6, abstract_en="Notes on a graph")
+    twice = _add_articles(db, 3, abstract_en="Graph of a graph, graph search")
+    _add_articles(db, 4, abstract_en="Unrelated")
+    db.flush()
+
+    items = _walk(client, "/articles/unassigned?status=submitted&search=graph&rank=true", page_size=4)
+
+    ids = [item["id"] for item in items]
+    assert sorted(ids) == sorted(in_title + in_abstract + twice)
+    ranks = dict(
+        db.execute(
+            text(
+                "SELECT id, ts_rank(search_vector, websearch_to_tsquery('english', 'graph')) "
+                "FROM articles WHERE id = ANY(:ids)"
+            ),
+            {"ids": ids},
+        ).all()
+    )
+    assert [ranks[article_id] for article_id in ids] == sorted(ranks.values(), reverse=True)
+    assert set(ids[:len(in_title)]) == set(in_title)
+
+
+@pytest.mark.postgres
+def test_total_count_is_planner_estimate(client, db):
+    _add_articles(db, 30)
+    _add_articles(db, 10, status=models.ArticleStatus.draft)
+    _add_articles(db, 20, created_at=datetime(2023, 6, 1, tzinfo=timezone.utc))
+    db.execute(text("ANALYZE articles"))
+
+    def total(url: str) -> dict:
+        response = client.get(url, headers=auth(EDITOR_ID, "editor"))
+        assert response.status_code == 200, response.text
+        return response.json()["pagination"]
+
+    # Параметры EXPLAIN (enum статуса, границы года) проходят обработку
+    # типов так же, как в самом запросе
+    for url in ("/articles/unassigned?status=submitted", "/articles/unassigned?status=all&year=2025"):
+        estimate = total(url)
+        exact = total(f"{url}&exact_count=true")
+        assert estimate["total_count_exact"] is False
+        assert exact["total_count_exact"] is True
+        assert exact["total_count"] // 2 <= estimate["total_count"] <= exact["total_count"] * 2
+    assert total("/articles/unassigned?status=submitted&exact_count=true")["total_count"] == 50
+    assert total("/articles/unassigned?status=all&year=2025&exact_count=true")["total_count"] == 40
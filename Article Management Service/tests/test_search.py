@@ -0,0 +1,104 @@
+"""
+Полнотекстовый поиск /articles/unassigned?search=...: search_vector и
+websearch_to_tsquery на трех языках — ранжирование, фразы, исключения и
+запросы без слов.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import models
+from tests.conftest import auth
+
+pytestmark = pytest.mark.postgres
+
+EDITOR_ID = 2
+START = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+
+def _add_article(db, minute: int, title_en: str = "Untitled", **fields) -> int:
+    article = models.Article(
+        title_kz=fields.pop("title_kz", "Мақала"),
+        title_en=title_en,
+        title_ru=fields.pop("title_ru", "Статья"),
+        status=models.ArticleStatus.submitted,
+        responsible_user_id=1,
+        created_at=START + timedelta(minutes=minute),
+        **fields,
+    )
+    db.add(article)
+    db.flush()
+    return article.id
+
+
+def _search(client, query: str, rank: bool = False) -> list[int]:
+    response = client.get(
+        "/articles/unassigned",
+        params={"search": query, "rank": rank, "exact_count": True, "page_size": 100},
+        headers=auth(EDITOR_ID, "editor"),
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["pagination"]["total_count"] == len(body["items"])
+    return [item["id"] for item in body["items"]]
+
+
+def test_rank_orders_title_matches_before_abstract_matches(client, db):
+    in_abstract = _add_article(db, 3, abstract_en="We also touch on graph methods.")
+    in_title = _add_article(db, 1, title_en="Graph methods")
+    in_both = _add_article(db, 0, title_en="Graph methods", abstract_en="Graph methods for graph data.")
+    _add_article(db, 4, title_en="Protein folding")
+
+    # Без rank — новые первыми, с rank — по релевантности
+    assert _search(client, "graph") == [in_abstract, in_title, in_both]
+    assert _search(client, "graph", rank=True) == [in_both, in_title, in_abstract]
+
+
+def test_search_covers_all_languages(client, db):
+    english = _add_article(db, 0, title_en="Neural networks")
+    russian = _add_article(db, 1, title_ru="Нейронные сети")
+    kazakh = _add_article(db, 2, abstract_kz="Нейрондық желілер туралы")
+
+    # english и russian — со стеммингом, казахский — 'simple' без него
+    assert _search(client, "network") == [english]
+    assert _search(client, "сеть") == [russian]
+    assert _search(client, "нейрондық") == [kazakh]
+
+
+def test_phrase_or_and_exclusion(client, db):
+    phrase = _add_article(db, 0, title_en="Neural network models")
+    reversed_words = _add_article(db, 1, title_en="A network of neural cells")
+    proteins = _add_article(db, 2, title_en="Protein structure")
+
+    assert _search(client, '"neural network"') == [phrase]
+    assert _search(client, "neural network") == [reversed_words, phrase]
+    assert _search(client, "cells or protein") == [proteins, reversed_words]
+
+
+def test_exclusion_applies_in_every_language(client, db):
+    phrase = _add_article(db, 0, title_en="Neural network models")
+    reversed_words = _add_article(db, 1, title_en="A network of neural cells")
+    russian = _add_article(db, 2, title_ru="Нейронные сети графов")
+
+    # "cells" хранится английской основой 'cell', "графов" — русской 'граф'
+    assert _search(client, "neural -cells") == [phrase]
+    assert _search(client, "сети -граф") == []
+    assert _search(client, "network -\"neural cells\"") == [phrase]
+    assert _search(client, "-cells") == [russian, phrase]
+    # Минус внутри фразы — часть фразы, а не исключение
+    assert _search(client, '"neural -cells"') == [reversed_words]
+
+
+@pytest.mark.parametrize("query", ["!!!", '"', "-", "or", "&|!:*()"])
+def test_query_without_words_matches_nothing(client, db, query):
+    _add_article(db, 0, title_en="Graph methods")
+
+    assert _search(client, query) == []
+    assert _search(client, query, rank=True) == []
+
+
+@pytest.mark.parametrize("query", ["", "   "])
+def test_blank_query_does_not_filter(client, db, query):
+    ids = [_add_article(db, minute, title_en=f"Article {minute}") for minute in range(3)]
+
+    assert _search(client, query) == ids[::-1]
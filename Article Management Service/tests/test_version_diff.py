@@ -0,0 +1,110 @@
+"""Сравнение версий статьи: пословный diff, наборы авторов и ключевых слов, кэш."""
+from app import models, version_diff
+from tests.conftest import StatementCounter, auth, make_authors, make_keywords
+
+AUTHOR_ID = 1
+EDITOR_ID = 2
+
+
+def _join(ops, kinds) -> str:
+    return "".join(op["text"] for op in ops if op["op"] in kinds)
+
+
+def test_word_diff_marks_changed_words():
+    ops = version_diff.word_diff("Graph neural networks", "Graph convolutional networks")
+
+    assert ops == [
+        {"op": "equal", "text": "Graph "},
+        {"op": "delete", "text": "neural"},
+        {"op": "insert", "text": "convolutional"},
+        {"op": "equal", "text": " networks"},
+    ]
+
+
+def test_word_diff_fragments_rebuild_both_texts():
+    old = "Мы  изучаем графы\nи сети."
+    new = "Мы изучаем большие графы\nи нейронные сети"
+
+    ops = version_diff.word_diff(old, new)
+
+    assert _join(ops, ("equal", "delete")) == old
+    assert _join(ops, ("equal", "insert")) == new
+
+
+def test_word_diff_handles_missing_text():
+    assert version_diff.word_diff(None, "new text") == [{"op": "insert", "text": "new text"}]
+    assert version_diff.word_diff("old", None) == [{"op": "delete", "text": "old"}]
+    assert version_diff.word_diff(None, None) == []
+
+
+def _article_with_two_versions(client, db):
+    author_ids = make_authors(db, 3)
+    keyword_ids = make_keywords(db, 2)
+    response = client.post(
+        "/articles/by_ids",
+        json={
+            "title_kz": "Мақала",
+            "title_en": "Graph neural networks",
+            "title_ru": "Статья",
+            "responsible_user_id": AUTHOR_ID,
+            "author_ids": author_ids[:2],
+            "keyword_ids": keyword_ids[:1],
+        },
+        headers=auth(AUTHOR_ID),
+    )
+    article_id = response.json()["id"]
+    client.put(f"/articles/{article_id}", json={}, headers=auth(AUTHOR_ID))
+    client.put(
+        f"/articles/{article_id}",
+        json={
+            "title_en": "Graph convolutional networks",
+            "doi": "10.1000/1",
+            "author_ids": author_ids[1:],
+            "keyword_ids": keyword_ids[:1],
+        },
+        headers=auth(AUTHOR_ID),
+    )
+    return article_id, author_ids
+
+
+def _diff(client, article_id, a=1, b=2, user=(EDITOR_ID, "editor")):
+    return client.get(f"/articles/editor/{article_id}/versions/{a}/diff/{b}", headers=auth(*user))
+
+
+def test_diff_endpoint_returns_only_changes(client, db):
+    article_id, author_ids = _article_with_two_versions(client, db)
+
+    response = _diff(client, article_id)
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["from_version"]["version_code"], body["to_version"]["version_code"]) == ("TAU-V1", "TAU-V2")
+    fields = {change["field"]: change for change in body["fields"]}
+    assert set(fields) == {"title_en", "doi"}
+    assert fields["doi"] == {"field": "doi", "old": None, "new": "10.1000/1", "words": None}
+    assert _join(fields["title_en"]["words"], ("insert",)) == "convolutional"
+    assert [author["id"] for author in body["authors"]["added"]] == [author_ids[2]]
+    assert [author["id"] for author in body["authors"]["removed"]] == [author_ids[0]]
+    assert body["authors"]["unchanged_count"] == 1
+    assert body["keywords"] == {"added": [], "removed": [], "unchanged_count": 1}
+
+
+def test_diff_endpoint_errors(client, db):
+    article_id, _ = _article_with_two_versions(client, db)
+
+    assert _diff(client, article_id, 1, 9).status_code == 404
+    assert _diff(client, article_id, user=(AUTHOR_ID, "author")).status_code == 403
+
+
+def test_cached_diff_shows_current_author_details(client, db):
+    article_id, author_ids = _article_with_two_versions(client, db)
+    _diff(client, article_id)
+
+    db.get(models.Author, author_ids[2]).last_name = "Renamed"
+    db.flush()
+    with StatementCounter() as counter:
+        response = _diff(client, article_id)
+
+    assert response.json()["authors"]["added"][0]["last_name"] == "Renamed"
+    # Снимки версий и связи берутся из кэша: только выбор версий и данные авторов
+    assert len(counter) == 2
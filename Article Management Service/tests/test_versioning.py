@@ -0,0 +1,124 @@
+"""
+Хранение версий ключевыми кадрами и дельтами (VERSION_STORAGE=delta)
+восстанавливает каждую версию в точности как полный снимок (full).
+"""
+import pytest
+from sqlalchemy import select
+
+from app import config, models, versioning
+from tests.conftest import auth, make_authors, make_keywords
+
+USER_ID = 1
+KEYFRAME_INTERVAL = 3
+
+# Последовательность правок статьи: каждая создает новую версию
+EDITS = [
+    {"title_en": "Graph neural networks"},
+    {"abstract_en": "We study graphs.", "abstract_ru": "Мы изучаем графы."},
+    {"doi": "10.1000/1", "article_type": "review"},
+    {"manuscript_file_id": "m1", "not_published_elsewhere": True},
+    {"abstract_en": None, "plagiarism_free": True, "authors_agree": True},
+    {"title_kz": "Графтар", "article_type": "original"},
+    {},
+    {"generative_ai_info": "none", "cover_letter_file_id": "c1"},
+    {"manuscript_file_id": None, "doi": None},
+    {"title_ru": "Графовые нейронные сети", "abstract_en": "Graphs again."},
+]
+
+
+def _write_versions(client, db, storage: str, monkeypatch) -> int:
+    monkeypatch.setattr(config, "VERSION_STORAGE", storage)
+    monkeypatch.setattr(config, "VERSION_KEYFRAME_INTERVAL", KEYFRAME_INTERVAL)
+    author_ids = make_authors(db, 3, prefix=storage)
+    keyword_ids = make_keywords(db, 3, prefix=storage)
+    response = client.post(
+        "/articles/by_ids",
+        json={
+            "title_kz": "Мақала",
+            "title_en": "Article",
+            "title_ru": "Статья",
+            "responsible_user_id": USER_ID,
+            "author_ids": author_ids[:1],
+            "keyword_ids": keyword_ids[:1],
+        },
+        headers=auth(USER_ID),
+    )
+    assert response.status_code == 200, response.text
+    article_id = response.json()["id"]
+    for edit in EDITS:
+        response = client.put(f"/articles/{article_id}", json=edit, headers=auth(USER_ID))
+        assert response.status_code == 200, response.text
+    return article_id
+
+
+def _versions(db, article_id: int):
+    return db.execute(
+        select(models.ArticleVersion.version_number, models.ArticleVersion.is_keyframe)
+        .where(models.ArticleVersion.article_id == article_id)
+        .order_by(models.ArticleVersion.version_number)
+    ).all()
+
+
+@pytest.fixture
+def articles(client, db, monkeypatch):
+    """(статья в режиме full, статья в режиме delta) с одинаковой историей правок."""
+    full_id = _write_versions(client, db, "full", monkeypatch)
+    delta_id = _write_versions(client, db, "delta", monkeypatch)
+    versioning._cache.clear()
+    db.expire_all()
+    return full_id, delta_id
+
+
+def test_delta_storage_writes_keyframes_and_deltas(db, articles):
+    full_id, delta_id = articles
+
+    assert all(is_keyframe for _, is_keyframe in _versions(db, full_id))
+    keyframes = [number for number, is_keyframe in _versions(db, delta_id) if is_keyframe]
+    assert keyframes == list(range(1, len(EDITS) + 1, KEYFRAME_INTERVAL))
+    # Колонки снимка версий-дельт пустые
+    delta_row = db.execute(
+        select(models.ArticleVersion.title_en, models.ArticleVersion.delta).where(
+            models.ArticleVersion.article_id == delta_id,
+            models.ArticleVersion.version_number == 2,
+        )
+    ).one()
+    assert delta_row.title_en is None
+    assert delta_row.delta == {"abstract_en": "We study graphs.", "abstract_ru": "Мы изучаем графы."}
+
+
+def test_reconstruct_every_version_matches_full_snapshot(db, articles):
+    full_id, delta_id = articles
+
+    for number in range(1, len(EDITS) + 1):
+        versioning._cache.clear()
+        assert versioning.reconstruct(db, delta_id, number) == versioning.reconstruct(db, full_id, number), number
+    # С прогретым кэшем результат тот же
+    for number in range(1, len(EDITS) + 1):
+        assert versioning.reconstruct(db, delta_id, number) == versioning.reconstruct(db, full_id, number), number
+
+
+def _without_ids(version: dict) -> dict:
+    # created_at — время записи версии, а не ее содержимое: статьи пишутся
+    # друг за другом и могут попасть в разные секунды
+    return {
+        **{key: value for key, value in version.items() if key not in ("id", "article_id", "created_at")},
+        "authors": [author["email"].removeprefix("full").removeprefix("delta") for author in version["authors"]],
+        "keywords": [keyword["title_en"].split()[-1] for keyword in version["keywords"]],
+    }
+
+
+def test_api_returns_identical_versions(client, articles):
+    full_id, delta_id = articles
+
+    # Все версии статьи (материализация в памяти по коллекции versions)
+    full = client.get(f"/articles/my/{full_id}", headers=auth(USER_ID)).json()["versions"]
+    delta = client.get(f"/articles/my/{delta_id}", headers=auth(USER_ID)).json()["versions"]
+    assert len(delta) == len(EDITS)
+    assert [_without_ids(v) for v in delta] == [_without_ids(v) for v in full]
+
+    # Отдельная версия (восстановление от ключевого кадра запросом к БД)
+    versioning._cache.clear()
+    for full_version, delta_version in zip(full, delta):
+        response = client.get(f"/articles/my/{delta_id}/versions/{delta_version['id']}", headers=auth(USER_ID))
+        assert response.status_code == 200, response.text
+        assert _without_ids(response.json()) == _without_ids(full_version)
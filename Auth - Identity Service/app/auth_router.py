@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
 from sqlalchemy.orm import Session
 import httpx
 from jose import jwt, JWTError
@@ -156,6 +156,18 @@ def get_user_full_info(
     return user_info
 
 
+@router.get("/users/batch", response_model=list[schemas.UserOut])
+def get_users_by_ids(
+    ids: list[int] = Query(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Получить информацию о нескольких пользователях одним запросом.
+    Внутренний эндпоинт для агрегаторов (API Gateway); отсутствующие ID пропускаются.
+    """
+    return db.query(models.User).filter(models.User.id.in_(ids)).all()
+
+
 @router.get("/users/{user_id}", response_model=schemas.UserOut)
 def get_user_by_id(
     user_id: int,
@@ -1,10 +1,17 @@
 from fastapi import FastAPI
+from app.deadline import DeadlineMiddleware
 from app.auth_router import router as auth_router
 from app.database import Base, engine
 
 app = FastAPI(title="Auth Service")
+app.add_middleware(DeadlineMiddleware)
 
 # создаем таблицы (можно убрать после миграций)
 Base.metadata.create_all(bind=engine)
 
 app.include_router(auth_router)
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
@@ -1,9 +1,11 @@
 from fastapi import FastAPI
 from sqlalchemy import inspect, text
+from app.deadline import DeadlineMiddleware
 from app.reviews_router import router as reviews_router
 from app.database import Base, engine
 
 app = FastAPI(title="Review Service")
+app.add_middleware(DeadlineMiddleware)
 
 # создаем таблицы
 Base.metadata.create_all(bind=engine)
@@ -60,3 +62,8 @@ def _ensure_schema():
 _ensure_schema()
 
 app.include_router(reviews_router)
+
+
+@app.get("/health")
+async def health():
+	return {"status": "ok"}
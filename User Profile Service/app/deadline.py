@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+from starlette.responses import JSONResponse
+
+# Абсолютный дедлайн запроса (Unix time, секунды); его присылает вызывающая
+# сторона, API Gateway только передает его дальше
+DEADLINE_HEADER = b"x-request-deadline"
+
+
+class DeadlineMiddleware:
+    """
+    Не начинать ответ, которого уже никто не ждёт.
+
+    Запрос с истёкшим дедлайном сразу получает 504. Остальные ждут начала
+    ответа не дольше оставшегося времени: если к дедлайну ответ ещё не начат,
+    обработка отменяется и клиенту уходит 504. Начатый ответ (например,
+    потоковое скачивание файла) дедлайном не ограничивается и не обрывается.
+
+    Отмена прерывает только async-код. Синхронный (def) обработчик, уже
+    запущенный в пуле потоков, доработает до конца, его результат просто
+    будет отброшен, поэтому для таких обработчиков экономия — в основном
+    на запросах, пришедших с уже истёкшим дедлайном.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        deadline = None
+        for name, value in scope["headers"]:
+            if name == DEADLINE_HEADER:
+                try:
+                    deadline = float(value)
+                except ValueError:
+                    pass
+                break
+        if deadline is None:
+            await self.app(scope, receive, send)
+            return
+
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            await JSONResponse({"detail": "Deadline exceeded"}, status_code=504)(scope, receive, send)
+            return
+
+        started = asyncio.Event()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                started.set()
+            await send(message)
+
+        task = asyncio.ensure_future(self.app(scope, receive, send_wrapper))
+        waiter = asyncio.ensure_future(started.wait())
+        try:
+            await asyncio.wait({task, waiter}, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if not task.done() and not started.is_set():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                if not started.is_set():
+                    await JSONResponse({"detail": "Deadline exceeded"}, status_code=504)(scope, receive, send)
+                    return
+            # Ответ начат (или готов): дальше тело отдается без ограничения по времени
+            await task
+        finally:
+            waiter.cancel()
+            if not task.done():
+                task.cancel()
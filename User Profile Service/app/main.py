@@ -1,10 +1,17 @@
 from fastapi import FastAPI
+from app.deadline import DeadlineMiddleware
 from app.users_router import router as users_router
 from app.database import Base, engine
 
 app = FastAPI(title="User Profile Service")
+app.add_middleware(DeadlineMiddleware)
 
 # создаём таблицы (можно убрать после миграций)
 Base.metadata.create_all(bind=engine)
 
 app.include_router(users_router)
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
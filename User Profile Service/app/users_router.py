@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Header, Request
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request
 from sqlalchemy.orm import Session
 from app import models, schemas, database, security
 from app import config
@@ -157,6 +157,12 @@ def get_reviewers(
     return enriched
 
 
+@router.get("/batch", response_model=list[schemas.UserProfileOut])
+def get_profiles_by_user_ids(ids: list[int] = Query(...), db: Session = Depends(get_db)):
+    """Профили нескольких пользователей одним запросом; отсутствующие ID пропускаются."""
+    return db.query(models.UserProfile).filter(models.UserProfile.user_id.in_(ids)).all()
+
+
 @router.get("/{user_id}", response_model=schemas.UserProfileOut)
 def get_profile(user_id: int, db: Session = Depends(get_db)):
     profile = db.query(models.UserProfile).filter(models.UserProfile.user_id == user_id).first()